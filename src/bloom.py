@@ -0,0 +1,92 @@
+import math
+from typing import Any, Dict, Iterable
+from src.hashing import hash64
+
+
+class CountingBloomFilter:
+    """
+    Считающий фильтр Блума: отвечает "точно нет" или "возможно есть"
+
+    Вместо битов хранятся счетчики (по байту), поэтому ключи можно удалять.
+    Счетчик, дошедший до 255, больше не меняется, чтобы удаление не дало ложного "точно нет"
+    """
+
+    def __init__(self, capacity: int = 1024, error_rate: float = 0.01) -> None:
+        """
+        :param capacity: на сколько ключей рассчитан фильтр
+        :param error_rate: допустимая доля ложных "возможно есть" при capacity ключах
+        """
+        if capacity <= 0:
+            raise ValueError("Емкость фильтра должна быть положительной")
+        if not 0 < error_rate < 1:
+            raise ValueError("Доля ложных срабатываний должна быть между 0 и 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.counters = bytearray(self.size)
+        self.count = 0
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[Any], capacity: int, error_rate: float) -> 'CountingBloomFilter':
+        """
+        Строит фильтр по набору ключей
+        :param keys: ключи
+        :param capacity: емкость фильтра
+        :param error_rate: доля ложных срабатываний
+        :return: фильтр
+        """
+        bloom = cls(capacity, error_rate)
+        for key in keys:
+            bloom.add(key)
+        return bloom
+
+    def _slots(self, key: Any) -> Iterable[int]:
+        """
+        Позиции счетчиков ключа (двойное хеширование: h1 + i * h2)
+        :param key: ключ
+        :return: номера счетчиков
+        """
+        h1 = hash64(key, 0)
+        h2 = hash64(key, 1) | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key: Any) -> None:
+        """Добавляет ключ"""
+        for slot in self._slots(key):
+            if self.counters[slot] < 255:
+                self.counters[slot] += 1
+        self.count += 1
+
+    def remove(self, key: Any) -> None:
+        """Удаляет ключ (ключ должен был быть добавлен раньше)"""
+        for slot in self._slots(key):
+            if 0 < self.counters[slot] < 255:
+                self.counters[slot] -= 1
+        self.count -= 1
+
+    def might_contain(self, key: Any) -> bool:
+        """
+        :param key: ключ
+        :return: False - ключа точно нет, True - ключ возможно есть
+        """
+        return all(self.counters[slot] for slot in self._slots(key))
+
+    def __contains__(self, key: Any) -> bool:
+        return self.might_contain(key)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        :return: параметры фильтра и ожидаемая доля ложных срабатываний при текущем числе ключей
+        """
+        expected = (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
+        return {
+            'keys': self.count,
+            'capacity': self.capacity,
+            'counters': self.size,
+            'hash_functions': self.hash_count,
+            'expected_error_rate': expected,
+        }
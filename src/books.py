@@ -1,3 +1,6 @@
+from typing import Any, Dict
+
+
 class Book:
     def __init__(self,title, author, year, genre, isbn):
         self.title = title
@@ -24,4 +27,33 @@ class Book:
         Хеширует по значению isbn (нужно для использования в set)
         :return:
         """
-        return hash(self.isbn)
\ No newline at end of file
+        return hash(self.isbn)
+
+    def copy(self) -> 'Book':
+        """
+        Копия книги. Все поля неизменяемые, поэтому она равносильна copy.deepcopy,
+        но не тратит время на обход объекта
+        :return: новая книга с теми же полями
+        """
+        return Book(self.title, self.author, self.year, self.genre, self.isbn)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        :return: словарь с атрибутами книги (для сохранения в файлы)
+        """
+        return {
+            'title': self.title,
+            'author': self.author,
+            'year': self.year,
+            'genre': self.genre,
+            'isbn': self.isbn,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Book':
+        """
+        Создает книгу из словаря, полученного через to_dict
+        :param data: словарь с атрибутами книги
+        :return: книга
+        """
+        return cls(data['title'], data['author'], int(data['year']), data['genre'], str(data['isbn']))
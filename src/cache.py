@@ -0,0 +1,98 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+from src.books import Book
+from src.collection import BookCollection
+
+
+class QueryCache:
+    """
+    Ограниченный LRU-кэш результатов поиска (по автору, году и жанру)
+
+    Каждому ключу запроса соответствует счетчик версий. Запись в кэше помнит версию,
+    с которой она была посчитана, поэтому изменение одного автора инвалидирует только
+    результаты этого автора, его года и его жанра, а остальные записи остаются валидными.
+    Счетчик хранится только пока по ключу есть запись, поэтому версий не больше, чем записей.
+    Кэш хранит собственные копии найденных книг и на каждое попадание отдает новые копии,
+    поэтому изменение возвращенных книг не портит последующие попадания. Копии делаются
+    через Book.copy без copy.deepcopy, так что попадание заметно дешевле поиска по индексу
+    """
+
+    def __init__(self, max_size: int = 256) -> None:
+        """
+        :param max_size: максимальное количество хранимых результатов
+        """
+        if max_size <= 0:
+            raise ValueError("Размер кэша должен быть положительным")
+        self.max_size = max_size
+        self.entries: OrderedDict[Tuple[str, Hashable], Tuple[int, Tuple[Book, ...]]] = OrderedDict()
+        self.versions: Dict[Tuple[str, Hashable], int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind: str, key: Hashable) -> BookCollection | None:
+        """
+        Достает результат из кэша
+        :param kind: тип запроса ('author', 'year' или 'genre')
+        :param key: значение, по которому искали
+        :return: коллекция копий сохраненных книг или None, если записи нет или она устарела
+        """
+        cache_key = (kind, key)
+        entry = self.entries.get(cache_key)
+        if entry is None or entry[0] != self.versions.get(cache_key, 0):
+            if entry is not None:
+                # Запись устарела, освобождаем место сразу
+                self._drop(cache_key)
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(cache_key)
+        self.hits += 1
+        return BookCollection([book.copy() for book in entry[1]])
+
+    def put(self, kind: str, key: Hashable, result: BookCollection) -> None:
+        """
+        Сохраняет результат запроса, вытесняя самый давно использованный при переполнении
+        :param kind: тип запроса
+        :param key: значение, по которому искали
+        :param result: найденная коллекция (в кэш попадают копии ее книг)
+        :return: None
+        """
+        cache_key = (kind, key)
+        self.entries[cache_key] = (self.versions.get(cache_key, 0), tuple(book.copy() for book in result))
+        self.entries.move_to_end(cache_key)
+        if len(self.entries) > self.max_size:
+            self._drop(next(iter(self.entries)))
+
+    def _drop(self, cache_key: Tuple[str, Hashable]) -> None:
+        """Удаляет запись вместе со счетчиком версий ее ключа"""
+        del self.entries[cache_key]
+        self.versions.pop(cache_key, None)
+
+    def invalidate(self, book: Book) -> None:
+        """
+        Увеличивает версии ключей, которые затрагивает изменение книги
+        :param book: добавленная или удаленная книга
+        :return: None
+        """
+        for cache_key in (('author', book.author), ('year', book.year), ('genre', book.genre.lower())):
+            # Если записи нет, устаревать нечему и счетчик не нужен
+            if cache_key in self.entries:
+                self.versions[cache_key] = self.versions.get(cache_key, 0) + 1
+
+    def clear(self) -> None:
+        """Очищает кэш вместе со счетчиками версий"""
+        self.entries.clear()
+        self.versions.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        :return: словарь со статистикой попаданий и промахов
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'size': len(self.entries),
+            'max_size': self.max_size,
+        }
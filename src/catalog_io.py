@@ -0,0 +1,123 @@
+import csv
+import json
+import os
+from typing import Iterable, Iterator, List
+from src.books import Book
+from src.library import Library
+
+FIELDS = ['title', 'author', 'year', 'genre', 'isbn']
+
+
+def _chunked(books: Iterable[Book], chunk_size: int) -> Iterator[List[Book]]:
+    """
+    Разбивает поток книг на пачки фиксированного размера
+    :param books: поток книг
+    :param chunk_size: размер пачки
+    :return: итератор по пачкам
+    """
+    if chunk_size <= 0:
+        raise ValueError("Размер пачки должен быть положительным")
+    chunk: List[Book] = []
+    for book in books:
+        chunk.append(book)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_csv(path: str, chunk_size: int = 10000) -> Iterator[List[Book]]:
+    """
+    Потоково читает каталог из CSV (с заголовком title,author,year,genre,isbn)
+    :param path: путь к файлу
+    :param chunk_size: сколько книг отдавать за раз
+    :return: итератор по пачкам книг
+    """
+    # utf-8-sig, чтобы файлы из Excel с BOM тоже читались
+    with open(path, encoding='utf-8-sig', newline='') as file:
+        yield from _chunked((Book.from_dict(row) for row in csv.DictReader(file)), chunk_size)
+
+
+def read_jsonl(path: str, chunk_size: int = 10000) -> Iterator[List[Book]]:
+    """
+    Потоково читает каталог из JSONL (одна книга - один объект в строке)
+    :param path: путь к файлу
+    :param chunk_size: сколько книг отдавать за раз
+    :return: итератор по пачкам книг
+    """
+    with open(path, encoding='utf-8') as file:
+        yield from _chunked((Book.from_dict(json.loads(line)) for line in file if line.strip()), chunk_size)
+
+
+def write_csv(books: Iterable[Book], path: str) -> int:
+    """
+    Построчно записывает книги в CSV
+    :param books: книги для записи
+    :param path: путь к файлу
+    :return: количество записанных книг
+    """
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(FIELDS)
+        for book in books:
+            writer.writerow([book.title, book.author, book.year, book.genre, book.isbn])
+            count += 1
+    return count
+
+
+def write_jsonl(books: Iterable[Book], path: str) -> int:
+    """
+    Построчно записывает книги в JSONL
+    :param books: книги для записи
+    :param path: путь к файлу
+    :return: количество записанных книг
+    """
+    count = 0
+    with open(path, 'w', encoding='utf-8') as file:
+        for book in books:
+            file.write(json.dumps(book.to_dict(), ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+def _format(path: str) -> str:
+    """
+    Определяет формат файла по расширению
+    :param path: путь к файлу
+    :return: 'csv' или 'jsonl'
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise ValueError(f"Неизвестный формат каталога: '{path}'")
+
+
+def import_catalog(library: Library, path: str, chunk_size: int = 10000) -> int:
+    """
+    Загружает каталог из CSV или JSONL в библиотеку пачками (в памяти держится не больше одной пачки)
+    :param library: библиотека, в которую загружаем
+    :param path: путь к файлу (.csv, .jsonl или .ndjson)
+    :param chunk_size: размер пачки
+    :return: количество прочитанных книг
+    """
+    reader = read_csv if _format(path) == 'csv' else read_jsonl
+    count = 0
+    for chunk in reader(path, chunk_size):
+        library.add_books(chunk)
+        count += len(chunk)
+    return count
+
+
+def export_catalog(library: Library, path: str) -> int:
+    """
+    Выгружает все книги библиотеки в CSV или JSONL, не собирая их в одну строку
+    :param library: библиотека
+    :param path: путь к файлу (.csv, .jsonl или .ndjson)
+    :return: количество записанных книг
+    """
+    writer = write_csv if _format(path) == 'csv' else write_jsonl
+    return writer(library.books, path)
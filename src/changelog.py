@@ -0,0 +1,217 @@
+import itertools
+import struct
+import zlib
+from collections import deque
+from typing import Deque, List, Tuple
+from src.books import Book
+from src.library import Library
+
+MAGIC = b'CDC1'
+BATCH_HEADER = struct.Struct('<4sQI')  # метка формата, номер первого события, количество событий
+OPS = {'add': 0, 'remove': 1}
+OP_NAMES = {code: op for op, code in OPS.items()}
+
+Change = Tuple[int, str, Book]
+
+
+class ChangeLagError(ValueError):
+    """Нужные события уже вытеснены из журнала изменений, реплику нужно копировать целиком"""
+
+
+def _pack_string(value: str) -> bytes:
+    data = value.encode('utf-8')
+    return struct.pack('<I', len(data)) + data
+
+
+def _unpack_string(data: bytes, offset: int) -> Tuple[str, int]:
+    (size,) = struct.unpack_from('<I', data, offset)
+    offset += 4
+    return str(data[offset:offset + size], 'utf-8'), offset + size
+
+
+def encode_batch(changes: List[Change]) -> bytes:
+    """
+    Кодирует пачку событий: заголовок и сжатое zlib тело.
+    Номера событий идут подряд, поэтому в заголовке хранится только номер первого.
+    Для добавления пишется книга целиком, для удаления - только ISBN
+    :param changes: события (номер, 'add' или 'remove', книга) по возрастанию номера
+    :return: байты пачки
+    """
+    body = bytearray()
+    for _, op, book in changes:
+        body.append(OPS[op])
+        if op == 'add':
+            body += struct.pack('<i', book.year)
+            for value in (book.title, book.author, book.genre):
+                body += _pack_string(value)
+        body += _pack_string(book.isbn)
+    first = changes[0][0] if changes else 0
+    return BATCH_HEADER.pack(MAGIC, first, len(changes)) + zlib.compress(bytes(body))
+
+
+def decode_batch(data: bytes) -> List[Change]:
+    """
+    Декодирует пачку, записанную encode_batch
+    :param data: байты пачки
+    :return: события (номер, операция, книга); у удалений известен только ISBN
+    """
+    magic, first, count = BATCH_HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Неизвестный формат пачки изменений")
+    body = zlib.decompress(data[BATCH_HEADER.size:])
+    changes: List[Change] = []
+    offset = 0
+    for number in range(first, first + count):
+        op = OP_NAMES[body[offset]]
+        offset += 1
+        if op == 'add':
+            (year,) = struct.unpack_from('<i', body, offset)
+            offset += 4
+            title, offset = _unpack_string(body, offset)
+            author, offset = _unpack_string(body, offset)
+            genre, offset = _unpack_string(body, offset)
+            isbn, offset = _unpack_string(body, offset)
+            book = Book(title, author, year, genre, isbn)
+        else:
+            isbn, offset = _unpack_string(body, offset)
+            book = Book('', '', 0, '', isbn)
+        changes.append((number, op, book))
+    return changes
+
+
+class ChangeLog:
+    """
+    Ограниченный журнал изменений библиотеки (change data capture)
+
+    Подписывается на библиотеку как слушатель и нумерует каждое добавление и удаление.
+    Хранит только последние capacity событий: реплика, отставшая сильнее,
+    получает ChangeLagError и копирует библиотеку целиком.
+    Журнал, подключенный к уже непустой библиотеке, начинает нумерацию с library.version
+    и запоминает этот номер в start: реплика, отставшая от start, сначала копирует библиотеку,
+    а не читает неполный журнал
+    """
+
+    def __init__(self, library: Library | None = None, capacity: int = 10000) -> None:
+        """
+        :param library: библиотека, на которую подписаться (None - подписать вручную через add_listener)
+        :param capacity: сколько последних событий хранить
+        """
+        if capacity <= 0:
+            raise ValueError("Размер журнала изменений должен быть положительным")
+        self.events: Deque[Change] = deque(maxlen=capacity)
+        self.sequence = 0  # Номер последнего события
+        # Номер, с которого начинается история журнала (None - журнал подписан вручную,
+        # и неизвестно, были ли изменения до подписки)
+        self.start: int | None = None
+        if library is not None:
+            self.sequence = self.start = library.version
+            library.add_listener(self)
+
+    def on_add(self, book: Book) -> None:
+        """Записывает добавление книги"""
+        self.sequence += 1
+        self.events.append((self.sequence, 'add', book))
+
+    def on_remove(self, book: Book) -> None:
+        """Записывает удаление книги"""
+        self.sequence += 1
+        self.events.append((self.sequence, 'remove', book))
+
+    def changes_since(self, sequence: int, limit: int | None = None) -> bytes:
+        """
+        События после заданного номера
+        :param sequence: номер последнего события, которое уже есть у получателя
+        :param limit: максимальное количество событий в пачке (None - все)
+        :return: закодированная пачка (encode_batch)
+        """
+        if sequence > self.sequence:
+            raise ValueError(f"События с номером {sequence} еще не было")
+        oldest = self.sequence - len(self.events) + 1
+        if sequence + 1 < oldest:
+            raise ChangeLagError(f"События после {sequence} уже вытеснены, самое старое - {oldest}")
+        # Нужные события лежат в конце очереди, поэтому она обходится справа
+        count = self.sequence - sequence
+        taken = count if limit is None else min(limit, count)
+        changes = list(itertools.islice(reversed(self.events), count - taken, count))
+        changes.reverse()
+        return encode_batch(changes)
+
+
+class Replica:
+    """
+    Реплика библиотеки, которая догоняет основную библиотеку по журналу изменений
+
+    Содержимое реплики совпадает с основной библиотекой, порядок книг в общей коллекции
+    может отличаться (удаления применяются по ISBN)
+    """
+
+    def __init__(self, library: Library | None = None) -> None:
+        """
+        :param library: библиотека-реплика (по умолчанию новая пустая)
+        """
+        self.library = library if library is not None else Library()
+        self.sequence = 0  # Номер последнего примененного события
+
+    def apply(self, batch: bytes) -> int:
+        """
+        Применяет пачку событий
+        :param batch: пачка из ChangeLog.changes_since
+        :return: количество примененных событий
+        """
+        changes = decode_batch(batch)
+        if not changes:
+            return 0
+        if changes[0][0] != self.sequence + 1:
+            raise ValueError(f"Пачка начинается с события {changes[0][0]}, ожидалось {self.sequence + 1}")
+
+        # Идущие подряд добавления применяются одним add_books
+        for op, group in itertools.groupby(changes, key=lambda change: change[1]):
+            if op == 'add':
+                self.library.add_books(book for _, _, book in group)
+            else:
+                for _, _, book in group:
+                    self.library.remove_by_isbn(book.isbn)
+        self.sequence = changes[-1][0]
+        return len(changes)
+
+    def sync(self, primary: Library, changelog: ChangeLog, batch_size: int | None = None) -> int:
+        """
+        Догоняет основную библиотеку по журналу. Полной копией - если реплика отстала
+        от начала истории журнала (changelog.start) или нужные события уже вытеснены.
+        Для журнала, подписанного вручную, начало истории неизвестно, поэтому первая
+        синхронизация с непустой библиотекой тоже делается полной копией
+        :param primary: основная библиотека
+        :param changelog: ее журнал изменений
+        :param batch_size: размер пачки (None - все события одной пачкой)
+        :return: количество примененных событий (для полной копии - количество книг)
+        """
+        if batch_size is not None and batch_size <= 0:
+            raise ValueError("Размер пачки должен быть положительным")
+        if changelog.start is None:
+            behind_start = self.sequence == 0 and len(primary.books) > 0
+        else:
+            behind_start = self.sequence < changelog.start
+        if behind_start:
+            return self.resync(primary, changelog)
+        applied = 0
+        try:
+            while self.sequence < changelog.sequence:
+                applied += self.apply(changelog.changes_since(self.sequence, batch_size))
+        except ChangeLagError:
+            return self.resync(primary, changelog)
+        return applied
+
+    def resync(self, primary: Library, changelog: ChangeLog) -> int:
+        """
+        Заменяет содержимое реплики полной копией основной библиотеки
+        :param primary: основная библиотека
+        :param changelog: ее журнал изменений
+        :return: количество скопированных книг
+        """
+        with primary.snapshot() as snapshot:
+            sequence = changelog.sequence
+            books = snapshot.get_all_books()
+        self.library.remove_where(lambda book: True)
+        self.library.add_books(books)
+        self.sequence = sequence
+        return len(books)
@@ -0,0 +1,67 @@
+import gc
+import os
+import pickle
+import struct
+import zlib
+from typing import Any, Dict
+
+MAGIC = b'LIBCKPT1'
+HEADER = struct.Struct('<8sQI')  # метка формата, номер шага, CRC32 сжатых данных
+
+
+def checkpoint_path(directory: str, step: int) -> str:
+    """
+    :param directory: каталог контрольных точек
+    :param step: номер шага
+    :return: путь к файлу контрольной точки этого шага
+    """
+    return os.path.join(directory, f"checkpoint_{step:09d}.bin")
+
+
+def save_checkpoint(path: str, step: int, state: Dict[str, Any]) -> None:
+    """
+    Записывает контрольную точку: заголовок и состояние в pickle, сжатое zlib.
+    Файл сначала пишется рядом и затем атомарно подменяется, поэтому сбой
+    во время записи не портит предыдущую контрольную точку
+    :param path: путь к файлу
+    :param step: номер последнего выполненного шага
+    :param state: состояние симуляции (библиотека, генератор случайных чисел и т.п.)
+    :return: None
+    """
+    data = zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), 1)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, step, zlib.crc32(data)))
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    """
+    Читает контрольную точку, записанную save_checkpoint
+    :param path: путь к файлу
+    :return: состояние симуляции (номер шага - под ключом 'step')
+    """
+    with open(path, 'rb') as file:
+        header = file.read(HEADER.size)
+        data = file.read()
+    if len(header) < HEADER.size:
+        raise ValueError(f"Файл '{path}' не является контрольной точкой")
+    magic, step, checksum = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"Файл '{path}' не является контрольной точкой")
+    if zlib.crc32(data) != checksum:
+        raise ValueError(f"Контрольная точка '{path}' повреждена")
+
+    # Как и при генерации книг, сборщик циклов на время создания миллионов объектов выключается
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        state = pickle.loads(zlib.decompress(data))
+    finally:
+        if gc_enabled:
+            gc.enable()
+    state['step'] = step
+    return state
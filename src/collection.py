@@ -54,15 +54,132 @@ class BookCollection:
         """
         self.books.remove(book)
 
+    def swap_remove(self, index: int) -> Book:
+        """
+        Удаляет книгу по позиции за O(1): на ее место ставится последняя книга
+        (порядок коллекции при этом меняется)
+        :param index: позиция удаляемой книги
+        :return: удаленная книга
+        """
+        last = self.books.pop()
+        if index == len(self.books):
+            return last
+        removed = self.books[index]
+        self.books[index] = last
+        return removed
+
     def __add__(self, other: 'BookCollection') -> 'BookCollection':
         """
-        Объединяет две коллекции книг (дубликаты убираются)
+        Объединяет две коллекции книг (дубликаты убираются, порядок сохраняется)
         :param other: другая коллекция, с которой хотим объединить текущую
         :return: новая коллекция с книгами из обеих коллекций
         """
-        #  __hash__ и __eq__ в Book реализовано, так что set работает правильно
-        comb_books = list(set(self.books + other.books))
-        return BookCollection(comb_books)
+        return self | other
+
+    def __or__(self, other: 'BookCollection') -> 'BookCollection':
+        """
+        Объединение за O(n+m): сначала книги текущей коллекции, затем новые книги из другой
+        :param other: другая коллекция
+        :return: новая коллекция без дубликатов (по ISBN)
+        """
+        seen = set()
+        res = []
+        for books in (self.books, other.books):
+            for book in books:
+                if book.isbn not in seen:
+                    seen.add(book.isbn)
+                    res.append(book)
+        return BookCollection(res)
+
+    def __and__(self, other: 'BookCollection') -> 'BookCollection':
+        """
+        Пересечение за O(n+m) в порядке текущей коллекции
+        :param other: другая коллекция
+        :return: новая коллекция с книгами, которые есть в обеих (по ISBN)
+        """
+        other_isbns = {book.isbn for book in other.books}
+        seen = set()
+        res = []
+        for book in self.books:
+            if book.isbn in other_isbns and book.isbn not in seen:
+                seen.add(book.isbn)
+                res.append(book)
+        return BookCollection(res)
+
+    def __sub__(self, other: 'BookCollection') -> 'BookCollection':
+        """
+        Разность за O(n+m) в порядке текущей коллекции
+        :param other: другая коллекция
+        :return: новая коллекция с книгами, которых нет в другой (по ISBN)
+        """
+        seen = {book.isbn for book in other.books}
+        res = []
+        for book in self.books:
+            if book.isbn not in seen:
+                seen.add(book.isbn)
+                res.append(book)
+        return BookCollection(res)
+
+    def __ior__(self, other: 'BookCollection') -> 'BookCollection':
+        """Объединение на месте (|=)"""
+        self.books = (self | other).books
+        return self
+
+    def __iand__(self, other: 'BookCollection') -> 'BookCollection':
+        """Пересечение на месте (&=)"""
+        self.books = (self & other).books
+        return self
+
+    def __isub__(self, other: 'BookCollection') -> 'BookCollection':
+        """Разность на месте (-=)"""
+        self.books = (self - other).books
+        return self
+
+    def merge_sorted(self, other: 'BookCollection', op: str = 'union') -> 'BookCollection':
+        """
+        Слияние двух коллекций, уже отсортированных по ISBN, без хеширования (за O(n+m))
+        :param other: другая коллекция, отсортированная по ISBN
+        :param op: 'union', 'intersection' или 'difference'
+        :return: новая коллекция, отсортированная по ISBN, без дубликатов
+        """
+        if op not in ('union', 'intersection', 'difference'):
+            raise ValueError(f"Неизвестная операция '{op}'")
+
+        left, right = self.books, other.books
+        i = j = 0
+        res: List[Book] = []
+
+        def push(book: Book) -> None:
+            # Во входах дубликаты стоят рядом, поэтому достаточно сравнить с последней
+            if not res or res[-1].isbn != book.isbn:
+                res.append(book)
+
+        while i < len(left) and j < len(right):
+            if left[i].isbn < right[j].isbn:
+                if op != 'intersection':
+                    push(left[i])
+                i += 1
+            elif left[i].isbn > right[j].isbn:
+                if op == 'union':
+                    push(right[j])
+                j += 1
+            else:
+                if op != 'difference':
+                    push(left[i])
+                # Пропускаем все книги с этим ISBN в правой коллекции (для разности важно)
+                isbn = right[j].isbn
+                while j < len(right) and right[j].isbn == isbn:
+                    j += 1
+                while i < len(left) and left[i].isbn == isbn:
+                    i += 1
+
+        if op != 'intersection':
+            for book in left[i:]:
+                push(book)
+        if op == 'union':
+            for book in right[j:]:
+                push(book)
+        return BookCollection(res)
 
     def extend(self, books: List['Book']) -> None:
         """
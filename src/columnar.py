@@ -0,0 +1,159 @@
+from typing import Any, Dict, Iterable, List
+from src.books import Book
+
+np: Any
+try:
+    import numpy as np
+except ImportError:  # numpy нужен только для колоночной аналитики
+    np = None
+
+
+class ColumnarCatalog:
+    """
+    Колоночное зеркало каталога для быстрой статистики на numpy
+
+    Год хранится массивом int32, автор и жанр - кодами в словарях (dictionary encoding).
+    Зеркало подписывается на библиотеку и обновляется в add_book/remove_book,
+    удаление - за O(1) перестановкой последней строки на место удаленной
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        """
+        :param capacity: начальный размер массивов (дальше растут удвоением)
+        """
+        if np is None:
+            raise ImportError("Для колоночной аналитики нужен numpy (pip install numpy)")
+        self.size = 0
+        self.years = np.empty(capacity, dtype=np.int32)
+        self.author_codes = np.empty(capacity, dtype=np.int32)
+        self.genre_codes = np.empty(capacity, dtype=np.int32)
+        self.authors: List[str] = []
+        self.author_ids: Dict[str, int] = {}
+        self.genres: List[str] = []
+        self.genre_ids: Dict[str, int] = {}
+        self.rows: Dict[str, int] = {}  # ISBN -> номер строки
+        self.isbns: List[str] = []  # номер строки -> ISBN
+
+    @classmethod
+    def from_books(cls, books: Iterable[Book]) -> 'ColumnarCatalog':
+        """
+        Строит зеркало сразу для набора книг
+        :param books: книги
+        :return: колоночный каталог
+        """
+        books = list(books)
+        catalog = cls(max(len(books), 1024))
+        for book in books:
+            catalog.on_add(book)
+        return catalog
+
+    @staticmethod
+    def _encode(value: str, values: List[str], ids: Dict[str, int]) -> int:
+        """
+        :return: код значения в словаре (новое значение получает следующий код)
+        """
+        code = ids.get(value)
+        if code is None:
+            code = ids[value] = len(values)
+            values.append(value)
+        return code
+
+    def _grow(self) -> None:
+        """Увеличивает массивы в два раза"""
+        capacity = len(self.years) * 2
+        for name in ('years', 'author_codes', 'genre_codes'):
+            column = np.empty(capacity, dtype=np.int32)
+            column[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, column)
+
+    def on_add(self, book: Book) -> None:
+        """Добавляет строку для книги"""
+        if book.isbn in self.rows:
+            return
+        if self.size == len(self.years):
+            self._grow()
+        row = self.size
+        self.years[row] = book.year
+        self.author_codes[row] = self._encode(book.author, self.authors, self.author_ids)
+        self.genre_codes[row] = self._encode(book.genre, self.genres, self.genre_ids)
+        self.rows[book.isbn] = row
+        self.isbns.append(book.isbn)
+        self.size += 1
+
+    def on_remove(self, book: Book) -> None:
+        """Удаляет строку книги, ставя на ее место последнюю строку"""
+        row = self.rows.pop(book.isbn, None)
+        if row is None:
+            return
+        last = self.size - 1
+        last_isbn = self.isbns.pop()
+        if row != last:
+            for column in (self.years, self.author_codes, self.genre_codes):
+                column[row] = column[last]
+            self.isbns[row] = last_isbn
+            self.rows[last_isbn] = row
+        self.size -= 1
+
+    def __len__(self) -> int:
+        return self.size
+
+    def year_histogram(self) -> Dict[int, int]:
+        """
+        :return: год -> количество книг (по возрастанию года)
+        """
+        years, counts = np.unique(self.years[:self.size], return_counts=True)
+        return dict(zip(years.tolist(), counts.tolist()))
+
+    def decade_counts(self) -> Dict[int, int]:
+        """
+        :return: начало десятилетия -> количество книг
+        """
+        decades, counts = np.unique(self.years[:self.size] // 10 * 10, return_counts=True)
+        return dict(zip(decades.tolist(), counts.tolist()))
+
+    @staticmethod
+    def _counts(codes, values: List[str]) -> Dict[str, int]:
+        """
+        :return: значение -> количество (значения без книг не попадают)
+        """
+        counts = np.bincount(codes, minlength=len(values))
+        present = np.flatnonzero(counts)
+        return {values[code]: int(counts[code]) for code in present.tolist()}
+
+    def author_counts(self) -> Dict[str, int]:
+        """
+        :return: автор -> количество книг
+        """
+        return self._counts(self.author_codes[:self.size], self.authors)
+
+    def genre_counts(self) -> Dict[str, int]:
+        """
+        :return: жанр -> количество книг
+        """
+        return self._counts(self.genre_codes[:self.size], self.genres)
+
+    def count(self, year_from: int | None = None, year_to: int | None = None,
+              author: str | None = None, genre: str | None = None) -> int:
+        """
+        Количество книг, подходящих под все заданные условия
+        :param year_from: год издания не раньше (включительно)
+        :param year_to: год издания не позже (включительно)
+        :param author: автор
+        :param genre: жанр
+        :return: количество книг
+        """
+        mask = np.ones(self.size, dtype=bool)
+        years = self.years[:self.size]
+        if year_from is not None:
+            mask &= years >= year_from
+        if year_to is not None:
+            mask &= years <= year_to
+        if author is not None:
+            if author not in self.author_ids:
+                return 0
+            mask &= self.author_codes[:self.size] == self.author_ids[author]
+        if genre is not None:
+            if genre not in self.genre_ids:
+                return 0
+            mask &= self.genre_codes[:self.size] == self.genre_ids[genre]
+        return int(np.count_nonzero(mask))
@@ -0,0 +1,15 @@
+import hashlib
+from typing import Any
+
+
+def hash64(value: Any, seed: int = 0) -> int:
+    """
+    Стабильный 64-битный хеш значения (в отличие от hash() не меняется между запусками,
+    поэтому структуры на его основе можно сохранять и объединять между процессами)
+    :param value: значение (приводится к строке)
+    :param seed: номер хеш-функции, разные seed дают независимые хеши
+    :return: целое число от 0 до 2**64 - 1
+    """
+    digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=8,
+                             salt=seed.to_bytes(16, 'little'))
+    return int.from_bytes(digest.digest(), 'little')
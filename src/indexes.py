@@ -1,16 +1,48 @@
-from typing import Any, Dict, Iterator
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List, TextIO
+import bisect
 import copy
+import itertools
+import re
 from src.collection import BookCollection
 from src.books import Book
+from src.bloom import CountingBloomFilter
 
-class IndexDict:
-    """Базовый класс для индексации"""
+REPORT_LIMIT = 100  # Сколько строк отчета показывает __repr__
+
+
+def book_line(book: Book) -> str:
+    """
+    :param book: книга
+    :return: строка отчета о книге
+    """
+    return f"{book.isbn}: {book.title} ({book.genre}, {book.author}, {book.year})\n"
+
+
+def truncated_report(lines: Iterator[str], limit: int = REPORT_LIMIT) -> str:
+    """
+    Собирает в строку только первые строки отчета, остальной отчет даже не строится
+    :param lines: строки отчета
+    :param limit: сколько строк оставить
+    :return: начало отчета
+    """
+    head = list(itertools.islice(lines, limit + 1))
+    if len(head) > limit:
+        return ''.join(head[:limit]) + f"... (показаны первые {limit} строк, полный отчет выводит write_report)\n"
+    return ''.join(head)
+
+
+class IndexDict(ABC):
+    """Базовый класс для индексации (наследник определяет key_of)"""
+    empty_message = "Индекс пуст"
 
     def __init__(self) -> None:
         """
         Инициализирует словарь для индексации (ключом может ыть как строка, так и число, например год изднаия ил автор)
         """
         self.index: Dict[Any, BookCollection] = {}
+        # Позиции книг внутри коллекций: ключ -> {isbn: позиция}, чтобы удалять за O(1)
+        self.positions: Dict[Any, Dict[str, int]] = {}
 
     def __getitem__(self, key: Any) -> BookCollection:
         """
@@ -31,6 +63,7 @@ class IndexDict:
         :return: None
         """
         self.index[key] = value
+        self.positions[key] = {book.isbn: i for i, book in enumerate(value)}
 
     def __len__(self) -> int:
         """
@@ -72,16 +105,179 @@ class IndexDict:
     def keys(self):
         return self.index.keys()
 
+    def iter_report(self) -> Iterator[str]:
+        """
+        :return: итератор по строкам отчета (заголовок ключа, затем его книги)
+        """
+        for key, collection in self.index.items():
+            yield f"{key}: {len(collection)} книг\n"
+            for book in collection:
+                yield book_line(book)
+
+    def write_report(self, stream: TextIO) -> int:
+        """
+        Построчно пишет полный отчет в поток, не собирая его в памяти
+        :param stream: поток для записи (файл, sys.stdout, ответ сервера)
+        :return: количество записанных строк
+        """
+        count = 0
+        for line in self.iter_report():
+            stream.write(line)
+            count += 1
+        return count
+
+    def __repr__(self) -> str:
+        if not self.index:
+            return self.empty_message
+        return truncated_report(self.iter_report())
+
+    @abstractmethod
+    def key_of(self, book: 'Book') -> Any:
+        """
+        :param book: книга
+        :return: ключ, под которым книга хранится в индексе
+        """
+
+    def add_book(self, book: 'Book') -> None:
+        """
+        Добавляет книгу под все ее ключи
+        :param book: книга которую нужно добавить
+        :return: None
+        """
+        for key in self.keys_of(book):
+            self._insert(key, book)
+
+    def remove_book(self, item: Any) -> None:
+        """
+        Удаляет книгу из индекса
+        :param item: книга (ISBNIndexDict принимает ISBN)
+        :return: None
+        """
+        self.discard(item)
+
+    def keys_of(self, book: 'Book') -> Iterable[Any]:
+        """
+        :param book: книга
+        :return: все ключи, под которыми книга хранится в индексе
+        """
+        return (self.key_of(book),)
+
+    def discard(self, book: 'Book') -> bool:
+        """
+        Удаляет книгу из индекса без сообщений, если ее там нет
+        :param book: книга которую нужно удалить
+        :return: True если книга была в индексе
+        """
+        removed = False
+        for key in self.keys_of(book):
+            removed = self._discard(key, book) or removed
+        return removed
+
+    def _insert(self, key: Any, book: 'Book') -> bool:
+        """
+        Добавляет книгу в коллекцию ключа за O(1)
+        :param key: ключ
+        :param book: книга
+        :return: True если добавили, False если книга с таким ISBN уже есть под этим ключом
+        """
+        positions = self.positions.setdefault(key, {})
+        if book.isbn in positions:
+            return False
+        if key not in self.index:
+            self.index[key] = BookCollection()
+        positions[book.isbn] = len(self.index[key])
+        self.index[key].append(book)
+        return True
+
+    def _discard(self, key: Any, book: 'Book') -> bool:
+        """
+        Удаляет книгу из коллекции ключа за O(1), ставя на ее место последнюю книгу
+        :param key: ключ
+        :param book: книга
+        :return: True если удалили, False если книги под этим ключом не было
+        """
+        positions = self.positions.get(key)
+        if positions is None or book.isbn not in positions:
+            return False
+
+        collection = self.index[key]
+        pos = positions.pop(book.isbn)
+        collection.swap_remove(pos)
+        if pos < len(collection):
+            positions[collection[pos].isbn] = pos
+
+        # Удаляем запись ключа, если коллекция стала пустой
+        if len(collection) == 0:
+            del self.index[key]
+            del self.positions[key]
+        return True
+
+    def remove_books(self, books: Iterable['Book']) -> None:
+        """
+        Удаляет много книг сразу: каждая затронутая коллекция сжимается за один проход
+        :param books: книги которые нужно удалить
+        :return: None
+        """
+        by_key: Dict[Any, set] = {}
+        for book in books:
+            for key in self.keys_of(book):
+                by_key.setdefault(key, set()).add(book.isbn)
+
+        for key, isbns in by_key.items():
+            if key not in self.index:
+                continue
+            kept: List[Book] = [book for book in self.index[key] if book.isbn not in isbns]
+            if kept:
+                self.index[key] = BookCollection(kept)
+                self.positions[key] = {book.isbn: i for i, book in enumerate(kept)}
+            else:
+                del self.index[key]
+                del self.positions[key]
+
 
 
 class ISBNIndexDict (IndexDict):
     """
     Словарная коллекция для индексации книг по ISBN
     """
+    empty_message = "Нет книги с таким ISBN"
 
-    def __init__(self):
-        """Инициализирует индекс по ISBN"""
+    def __init__(self, bloom_error_rate: float | None = None, bloom_capacity: int = 1024):
+        """
+        Инициализирует индекс по ISBN
+        :param bloom_error_rate: если задана, перед индексом ставится фильтр Блума с такой
+        долей ложных срабатываний, и поиск отсутствующих ISBN не доходит до индекса
+        :param bloom_capacity: начальная емкость фильтра (при переполнении фильтр пересобирается вдвое больше)
+        """
         super().__init__()
+        self.bloom = CountingBloomFilter(bloom_capacity, bloom_error_rate) if bloom_error_rate else None
+        self.filter_checks = 0
+        self.filter_negatives = 0
+        self.filter_false_positives = 0
+
+    def _insert(self, key: Any, book: 'Book') -> bool:
+        """Добавляет книгу и ее ISBN в фильтр"""
+        inserted = super()._insert(key, book)
+        if inserted and self.bloom is not None:
+            if self.bloom.count >= self.bloom.capacity:
+                self.bloom = CountingBloomFilter.from_keys(self.index.keys(), self.bloom.capacity * 2,
+                                                           self.bloom.error_rate)
+            else:
+                self.bloom.add(key)
+        return inserted
+
+    def _discard(self, key: Any, book: 'Book') -> bool:
+        """Удаляет книгу и ее ISBN из фильтра"""
+        removed = super()._discard(key, book)
+        if removed and self.bloom is not None:
+            self.bloom.remove(key)
+        return removed
+
+    def __setitem__(self, key: Any, value: BookCollection) -> None:
+        """Устанавливает значение по ключу и добавляет ключ в фильтр"""
+        if self.bloom is not None and key not in self.index:
+            self.bloom.add(key)
+        super().__setitem__(key, value)
 
     def add_book(self, book: 'Book') -> None:
         """
@@ -89,10 +285,8 @@ class ISBNIndexDict (IndexDict):
         :param book: книга которую нужно добавить
         :return: None
         """
-        if book.isbn in self.index:
+        if not self._insert(book.isbn, book):
             print(f"Книга с ISBN {book.isbn} уже существует")
-            return
-        self.index[book.isbn] = BookCollection([book])
 
     def remove_book(self, isbn: str) -> None:
         """
@@ -104,22 +298,64 @@ class ISBNIndexDict (IndexDict):
             print(f"Книга с ISBN '{isbn}' не найдена")
             return
 
-        del self.index[isbn]
+        self._discard(isbn, self.index[isbn][0])
 
-    def __repr__(self) -> str:
-        if not self.index:
-            return "Нет книги с таким ISBN"
+    def remove_books(self, books: Iterable['Book']) -> None:
+        """
+        Удаляет много книг сразу
+        :param books: книги которые нужно удалить
+        :return: None
+        """
+        for book in books:
+            self._discard(book.isbn, book)
 
-        res =''
+    def get(self, key: Any, default: BookCollection | None = None) -> BookCollection:
+        """
+        Как IndexDict.get, но сначала спрашивает фильтр Блума (если он есть)
+        :param key: ISBN
+        :param default: значение по умолчанию если ключ не найден
+        :return: копия найденной коллекции или значение по умолчанию
+        """
+        if self.bloom is not None:
+            self.filter_checks += 1
+            if not self.bloom.might_contain(key):
+                self.filter_negatives += 1
+                return BookCollection([]) if default is None else copy.deepcopy(default)
+            if key not in self.index:
+                self.filter_false_positives += 1
+        return super().get(key, default)
+
+    def filter_stats(self) -> Dict[str, Any]:
+        """
+        :return: счетчики фильтра Блума (пустой словарь, если фильтра нет)
+        """
+        if self.bloom is None:
+            return {}
+        return {
+            'checks': self.filter_checks,
+            'negatives': self.filter_negatives,
+            'false_positives': self.filter_false_positives,
+            **self.bloom.stats(),
+        }
+
+    def key_of(self, book: 'Book') -> str:
+        """Ключ индекса - ISBN книги"""
+        return book.isbn
+
+    def iter_report(self) -> Iterator[str]:
+        """
+        :return: итератор по строкам отчета (по строке на книгу)
+        """
         for isbn, collection in self.index.items():
             for book in collection:
-                res += f"{book.isbn}: {book.title} ({book.genre}, {book.author}, {book.year})\n"
-        return res
+                yield book_line(book)
 
 class AuthorIndexDict(IndexDict):
     """
     Словарная коллекция для индексации книг по автору
     """
+    empty_message = "Нет книг с таким автором"
+
     def __init__(self):
         """Инициализирует индекс по автору"""
         super().__init__()
@@ -130,11 +366,7 @@ class AuthorIndexDict(IndexDict):
         :param book: книга которую нужно добавить
         :return: None
         """
-        if book.author not in self.index:
-            self.index[book.author] = BookCollection()
-
-        if book not in self.index[book.author]:
-            self.index[book.author].append(book)
+        self._insert(book.author, book)
 
     def remove_book(self, book: 'Book') -> None:
         """
@@ -142,14 +374,12 @@ class AuthorIndexDict(IndexDict):
         :param book: книга которую нужно удалить
         :return: None
         """
-        if book.author in self.index:
-            if book in self.index[book.author]:
-                self.index[book.author].remove(book)
-                # Удаляем запись этого автора, если коллекция книг этого автора стала пустой
-                if len(self.index[book.author]) == 0:
-                    del self.index[book.author]
-            else:
-                print(f"Книга {book.title} не найдена в коллекции автора {book.author}")
+        if book.author in self.index and not self._discard(book.author, book):
+            print(f"Книга {book.title} не найдена в коллекции автора {book.author}")
+
+    def key_of(self, book: 'Book') -> str:
+        """Ключ индекса - автор книги"""
+        return book.author
 
 
     def get_all_books_author(self,author: str) -> BookCollection:
@@ -164,22 +394,21 @@ class AuthorIndexDict(IndexDict):
             print(f" Книги автора {author} не найдены")
             return BookCollection([])
 
-    def __repr__(self) ->  str :
-        if not self.index:
-            return "Нет книг с таким автором"
-
-        res = ''
+    def iter_report(self) -> Iterator[str]:
+        """
+        :return: итератор по строкам отчета (заголовок автора, затем его книги)
+        """
         for author, collection in self.index.items():
-            res += f"Найдено {len(collection)} книг от автора {author}:\n\n"
+            yield f"Найдено {len(collection)} книг от автора {author}:\n\n"
             for book in collection:
-                res += f"{book.isbn}: {book.title} ({book.genre}, {book.author}, {book.year})\n"
-        return res
+                yield book_line(book)
 
 
 class YearIndexDict(IndexDict):
     """
     Словарная коллекция для индексации книг по году издания
     """
+    empty_message = "Нет книг с таким годом издания"
 
     def __init__(self):
         """Инициализирует индекс по году издания"""
@@ -191,11 +420,7 @@ class YearIndexDict(IndexDict):
         :param book: книга которую нужно добавить
         :return: None
         """
-        if book.year not in self.index:
-            self.index[book.year] = BookCollection()
-
-        if book not in self.index[book.year]:
-            self.index[book.year].append(book)
+        self._insert(book.year, book)
 
     def remove_book(self, book: 'Book') -> None:
         """
@@ -203,14 +428,12 @@ class YearIndexDict(IndexDict):
         :param book: книга которую нужно удалить
         :return: None
         """
-        if book.year in self.index:
-            if book in self.index[book.year]:
-                self.index[book.year].remove(book)
-                # Удаляем запись этого автора, если коллекция книг этого автора стала пустой
-                if len(self.index[book.year]) == 0:
-                    del self.index[book.year]
-            else:
-                print(f"Книга {book.title} не найдена в коллекции {book.year} года")
+        if book.year in self.index and not self._discard(book.year, book):
+            print(f"Книга {book.title} не найдена в коллекции {book.year} года")
+
+    def key_of(self, book: 'Book') -> int:
+        """Ключ индекса - год издания книги"""
+        return book.year
 
 
     def get_all_books_year(self, year: int) -> BookCollection:
@@ -225,13 +448,165 @@ class YearIndexDict(IndexDict):
             print(f" Книги {year} года издания не найдены")
             return BookCollection([])
 
-    def __repr__(self) -> str:
-        if not self.index:
-            return "Нет книг с таким годом издания"
-
-        res = ''
+    def iter_report(self) -> Iterator[str]:
+        """
+        :return: итератор по строкам отчета (заголовок года, затем книги этого года)
+        """
         for year, collection in self.index.items():
-            res += f"Найдено {len(collection)} книг {year} года издания:\n\n"
+            yield f"Найдено {len(collection)} книг {year} года издания:\n\n"
             for book in collection:
-                res += f"{book.isbn}: {book.title} ({book.genre}, {book.author}, {book.year})\n\n"
-        return res
+                yield book_line(book) + "\n"
+
+
+class HashIndexDict(IndexDict):
+    """
+    Словарная коллекция для индексации книг по произвольному полю
+    """
+
+    def __init__(self, field: str):
+        """
+        Инициализирует индекс по полю
+        :param field: имя атрибута книги (например 'genre')
+        """
+        super().__init__()
+        self.field = field
+
+    def key_of(self, book: 'Book') -> Any:
+        """Ключ индекса - значение поля книги"""
+        return getattr(book, self.field)
+
+
+class SortedIndexDict(HashIndexDict):
+    """
+    Словарная коллекция по полю с отсортированными ключами, поддерживает поиск по диапазону
+    """
+
+    def __init__(self, field: str):
+        """
+        Инициализирует индекс по полю
+        :param field: имя атрибута книги (например 'year')
+        """
+        super().__init__(field)
+        self.sorted_keys: List[Any] = []
+
+    def add_book(self, book: 'Book') -> None:
+        """
+        Добавляет книгу, новый ключ встает на свое место в отсортированном списке
+        :param book: книга которую нужно добавить
+        :return: None
+        """
+        key = self.key_of(book)
+        if key not in self.index:
+            bisect.insort(self.sorted_keys, key)
+        self._insert(key, book)
+
+    def discard(self, book: 'Book') -> bool:
+        """
+        Удаляет книгу, а ключ без книг убирает из отсортированного списка
+        :param book: книга которую нужно удалить
+        :return: True если книга была в индексе
+        """
+        key = self.key_of(book)
+        removed = self._discard(key, book)
+        if removed and key not in self.index:
+            del self.sorted_keys[bisect.bisect_left(self.sorted_keys, key)]
+        return removed
+
+    def remove_books(self, books: Iterable['Book']) -> None:
+        """
+        Удаляет много книг сразу и один раз пересобирает список ключей
+        :param books: книги которые нужно удалить
+        :return: None
+        """
+        super().remove_books(books)
+        self.sorted_keys = [key for key in self.sorted_keys if key in self.index]
+
+    def range(self, low: Any = None, high: Any = None) -> BookCollection:
+        """
+        Книги, у которых значение поля в диапазоне [low, high]
+        :param low: нижняя граница (None - без границы)
+        :param high: верхняя граница (None - без границы)
+        :return: коллекция найденных книг (копия), по возрастанию ключа
+        """
+        start = 0 if low is None else bisect.bisect_left(self.sorted_keys, low)
+        end = len(self.sorted_keys) if high is None else bisect.bisect_right(self.sorted_keys, high)
+        res: List[Book] = []
+        for key in self.sorted_keys[start:end]:
+            res.extend(self.index[key])
+        return copy.deepcopy(BookCollection(res))
+
+
+class TextIndexDict(IndexDict):
+    """
+    Словарная коллекция для полнотекстового поиска: слово -> книги, в поле которых оно встречается
+    """
+
+    def __init__(self, field: str = 'title'):
+        """
+        Инициализирует индекс по словам поля
+        :param field: имя текстового атрибута книги
+        """
+        super().__init__()
+        self.field = field
+
+    @staticmethod
+    def tokens(text: Any) -> List[str]:
+        """
+        :param text: текст
+        :return: различные слова текста в нижнем регистре
+        """
+        return list(dict.fromkeys(re.findall(r'\w+', str(text).lower())))
+
+    def key_of(self, book: 'Book') -> str:
+        """Значение поля книги целиком (в индексе книга лежит под его словами, см. keys_of)"""
+        return str(getattr(book, self.field))
+
+    def keys_of(self, book: 'Book') -> Iterable[str]:
+        """Ключи индекса - слова поля книги"""
+        return self.tokens(getattr(book, self.field))
+
+    def search(self, text: str) -> BookCollection:
+        """
+        Книги, в поле которых есть все слова запроса
+        :param text: запрос
+        :return: коллекция найденных книг (копия)
+        """
+        tokens = self.tokens(text)
+        if not tokens or any(token not in self.index for token in tokens):
+            return BookCollection([])
+
+        # Начинаем с самого короткого списка, чтобы пересечения были дешевле
+        collections = sorted((self.index[token] for token in tokens), key=len)
+        res = collections[0]
+        for collection in collections[1:]:
+            res = res & collection
+        return copy.deepcopy(BookCollection(list(res)))
+
+
+INDEX_KINDS = ('hash', 'sorted', 'text')
+
+
+def make_index(field: str, kind: str = 'hash', **options: Any) -> IndexDict:
+    """
+    Создает пустой индекс нужного вида
+    :param field: имя атрибута книги
+    :param kind: 'hash' (поиск по равенству), 'sorted' (еще и по диапазону) или 'text' (по словам)
+    :param options: настройки индекса (например bloom_error_rate для хеш-индекса по ISBN)
+    :return: индекс
+    """
+    if kind not in INDEX_KINDS:
+        raise ValueError(f"Неизвестный вид индекса '{kind}', доступны: {', '.join(INDEX_KINDS)}")
+    if options and (kind != 'hash' or field != 'isbn'):
+        raise ValueError(f"Индекс '{kind}' по полю '{field}' не принимает настроек")
+    if kind == 'sorted':
+        return SortedIndexDict(field)
+    if kind == 'text':
+        return TextIndexDict(field)
+
+    if field == 'isbn':
+        return ISBNIndexDict(**options)
+    if field == 'author':
+        return AuthorIndexDict()
+    if field == 'year':
+        return YearIndexDict()
+    return HashIndexDict(field)
@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List
+from src.books import Book
+from src.library import Library
+
+
+class Journal:
+    """
+    Журнал упреждающей записи (write-ahead log) для библиотеки
+
+    Каждое добавление и удаление книги записывается строкой JSONL. Записи копятся
+    в буфере и сбрасываются на диск пачкой с одним fsync (group commit).
+    Библиотека применяет изменение раньше, чем оно попадает на диск, поэтому после сбоя
+    теряются записи незакоммиченной пачки: не больше batch_size - 1 записей и не старше
+    max_delay секунд, потому что по истечении этого времени пачка коммитится таймером,
+    даже если новых изменений нет.
+    Базовый снимок хранится отдельным файлом, журнал накатывается поверх него
+    """
+
+    def __init__(self, path: str, snapshot_path: str | None = None, batch_size: int = 64,
+                 max_delay: float | None = 1.0) -> None:
+        """
+        :param path: путь к файлу журнала
+        :param snapshot_path: путь к файлу базового снимка (по умолчанию path + '.snapshot')
+        :param batch_size: сколько записей копить перед сбросом на диск
+        :param max_delay: сколько секунд запись может ждать коммита (None - ждать заполнения пачки)
+        """
+        if batch_size <= 0:
+            raise ValueError("Размер пачки должен быть положительным")
+        if max_delay is not None and max_delay <= 0:
+            raise ValueError("Задержка коммита должна быть положительной")
+        self.path = path
+        self.snapshot_path = snapshot_path if snapshot_path else path + '.snapshot'
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.pending: List[str] = []
+        # Таймер коммитит из своего потока, поэтому буфер и файл меняются под блокировкой
+        self.lock = threading.RLock()
+        self.timer: threading.Timer | None = None
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def on_add(self, book: Book) -> None:
+        """Записывает добавление книги"""
+        self._append({'op': 'add', 'book': book.to_dict()})
+
+    def on_remove(self, book: Book) -> None:
+        """Записывает удаление книги"""
+        self._append({'op': 'remove', 'isbn': book.isbn})
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        """
+        Кладет запись в буфер и коммитит пачку, если она заполнилась.
+        Первая запись пачки запускает таймер, который закоммитит ее через max_delay секунд
+        :param record: запись журнала
+        :return: None
+        """
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        with self.lock:
+            self.pending.append(line)
+            if len(self.pending) >= self.batch_size:
+                self.commit()
+            elif self.timer is None and self.max_delay is not None:
+                self.timer = threading.Timer(self.max_delay, self.commit)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def commit(self) -> None:
+        """
+        Сбрасывает накопленные записи на диск одной записью и одним fsync
+        :return: None
+        """
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.pending:
+                return
+            self.file.write('\n'.join(self.pending) + '\n')
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.pending.clear()
+
+    def restore(self, library: Library | None = None) -> Library:
+        """
+        Восстанавливает библиотеку: загружает базовый снимок, накатывает журнал
+        и подписывает журнал на дальнейшие изменения
+        :param library: пустая библиотека, в которую загружать (по умолчанию создается новая)
+        :return: восстановленная библиотека
+        """
+        if library is None:
+            library = Library()
+
+        # Сначала сворачиваем все операции в итоговое состояние, чтобы не добавлять
+        # в индексы книги, которые потом все равно будут удалены
+        state: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding='utf-8') as file:
+                for line in file:
+                    if line.strip():
+                        data = json.loads(line)
+                        state[data['isbn']] = data
+
+        self.commit()
+        valid_size = 0
+        with open(self.path, 'rb') as file:
+            for raw in file:
+                try:
+                    record = json.loads(raw)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    # Недописанная последняя строка после сбоя
+                    break
+                if not raw.endswith(b'\n'):
+                    break
+                valid_size += len(raw)
+                if record['op'] == 'add':
+                    state.setdefault(record['book']['isbn'], record['book'])
+                elif record['op'] == 'remove':
+                    state.pop(record['isbn'], None)
+
+        # Отрезаем битый хвост, чтобы новые записи не склеились с ним
+        if valid_size != os.path.getsize(self.path):
+            self.file.truncate(valid_size)
+
+        library.add_books(Book.from_dict(data) for data in state.values())
+
+        # Повторный restore не должен подписывать журнал второй раз, иначе каждое изменение запишется дважды
+        if not any(listener is self for listener in library.listeners):
+            library.add_listener(self)
+        return library
+
+    def compact(self, library: Library) -> None:
+        """
+        Записывает текущее состояние библиотеки новым базовым снимком и очищает журнал
+        :param library: библиотека, на которую подписан журнал
+        :return: None
+        """
+        self.commit()
+
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            for book in library.books:
+                file.write(json.dumps(book.to_dict(), ensure_ascii=False, separators=(',', ':')) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        # Снимок уже на диске, теперь журнал можно обнулить
+        with self.lock:
+            self.file.close()
+            self.file = open(self.path, 'w', encoding='utf-8')
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        """Коммитит оставшиеся записи и закрывает файл журнала"""
+        with self.lock:
+            if not self.file.closed:
+                self.commit()
+                self.file.close()
+
+    def __enter__(self) -> 'Journal':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -1,21 +1,120 @@
+import bisect
+import copy
+import random
+import weakref
 from src.collection import BookCollection
-from src.indexes import  ISBNIndexDict, AuthorIndexDict, YearIndexDict
+from src.indexes import IndexDict, SortedIndexDict, TextIndexDict, make_index, truncated_report
 from src.books import Book
-from typing import Dict, Any
+from src.cache import QueryCache
+from src.snapshot import LibrarySnapshot
+from src.columnar import ColumnarCatalog
+from src.sketches import StatisticsSketch
+from src.randomness import resolve_rng
+from typing import Callable, Dict, Any, Iterable, Iterator, List, TextIO, Tuple
+
+BOOK_FIELDS = ('title', 'author', 'year', 'genre', 'isbn')
+DEFAULT_INDEXES = {'isbn': 'hash', 'author': 'hash', 'year': 'hash'}
 
 
 class Library:
     """
     Класс библиотеки, содержит коллекцию всех книг и коллекции индексов
     """
-    def __init__(self):
-        """Инициализирует библиотеку с пустыми коллекциями"""
+    def __init__(self, cache_size: int | None = None, columnar: bool = False,
+                 indexes: Dict[str, str] | None = None, sketches: bool = False):
+        """
+        Инициализирует библиотеку с пустыми коллекциями
+        :param cache_size: размер LRU-кэша результатов поиска (None - без кэша). Кэш, как и поиск
+            без него, возвращает копии книг
+        :param columnar: вести колоночное зеркало каталога для статистики (нужен numpy)
+        :param sketches: вести приблизительную статистику (get_statistics(approximate=True))
+        :param indexes: какие индексы завести, поле -> вид (по умолчанию хеш-индексы по isbn, автору и году)
+        """
         self.books = BookCollection()  # Коллекция всех книг
-        self.indexes = {
-            'isbn': ISBNIndexDict(),
-            'автор': AuthorIndexDict(),
-            'год издания': YearIndexDict()
-        }
+        self.positions: Dict[str, int] = {}  # ISBN -> позиция книги в self.books
+        # Объявленные индексы (поле -> вид) и уже построенные индексы (поле -> индекс).
+        # Индекс строится при первом запросе к нему, до этого добавление книг его не трогает
+        self.index_specs: Dict[str, str] = {}
+        self.index_options: Dict[str, Dict[str, Any]] = {}
+        self.indexes: Dict[str, IndexDict] = {}
+        if indexes is None:
+            indexes = DEFAULT_INDEXES
+        for field, kind in indexes.items():
+            self.create_index(field, kind)
+        self.cache = QueryCache(cache_size) if cache_size else None
+        # Подписчики на изменения (журнал и т.п.), у каждого есть on_add(book) и on_remove(book)
+        self.listeners: List[Any] = []
+        self.version = 0  # Номер последнего изменения
+        # Открытые снимки и история изменений, которая нужна им для чтения
+        self._snapshots: weakref.WeakSet = weakref.WeakSet()
+        self._history: List[Tuple[int, str, Book]] = []
+
+        self.columnar = ColumnarCatalog() if columnar else None
+        if self.columnar is not None:
+            self.add_listener(self.columnar)
+
+        self.sketches = StatisticsSketch() if sketches else None
+        if self.sketches is not None:
+            self.add_listener(self.sketches)
+
+    def add_listener(self, listener: Any) -> None:
+        """
+        Подписывает объект на изменения библиотеки
+        :param listener: объект с методами on_add(book) и on_remove(book)
+        :return: None
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: Any) -> None:
+        """
+        Отписывает объект от изменений библиотеки
+        :param listener: ранее подписанный объект
+        :return: None
+        """
+        self.listeners.remove(listener)
+
+    def create_index(self, field: str, kind: str = 'hash', **options: Any) -> None:
+        """
+        Объявляет индекс по полю книги. Сам индекс строится лениво, при первом запросе
+        :param field: поле книги ('title', 'author', 'year', 'genre' или 'isbn')
+        :param kind: 'hash', 'sorted' или 'text'
+        :param options: настройки индекса (например bloom_error_rate=0.01 для индекса по ISBN)
+        :return: None
+        """
+        if field not in BOOK_FIELDS:
+            raise ValueError(f"У книги нет поля '{field}'")
+        # Проверяем вид и настройки сразу, а не при первом запросе
+        make_index(field, kind, **options)
+        if self.index_specs.get(field) != kind or self.index_options.get(field) != options:
+            self.indexes.pop(field, None)
+        self.index_specs[field] = kind
+        self.index_options[field] = options
+
+    def drop_index(self, field: str) -> None:
+        """
+        Удаляет индекс по полю (поиск по нему дальше идет перебором)
+        :param field: поле книги
+        :return: None
+        """
+        if field not in self.index_specs:
+            raise KeyError(f"Индекса по полю '{field}' нет")
+        del self.index_specs[field]
+        del self.index_options[field]
+        self.indexes.pop(field, None)
+
+    def get_index(self, field: str) -> IndexDict | None:
+        """
+        Возвращает индекс по полю, при первом обращении строит его по всем книгам
+        :param field: поле книги
+        :return: индекс или None, если индекс по этому полю не объявлен
+        """
+        index = self.indexes.get(field)
+        if index is None and field in self.index_specs:
+            index = make_index(field, self.index_specs[field], **self.index_options[field])
+            for book in self.books:
+                index.add_book(book)
+            self.indexes[field] = index
+        return index
 
     def add_book(self, book: Book) -> None:
         """
@@ -23,13 +122,41 @@ class Library:
         :param book: книга которую нужно добавить
         :return: None
         """
+        if book.isbn in self.positions:
+            print(f"Книга с ISBN {book.isbn} уже есть в библиотеке")
+            return
+
+        self._changed('add', book)
+
         # Добавляем книгу в общую коллекцию
+        self.positions[book.isbn] = len(self.books)
         self.books.append(book)
 
-        # Обновляем все индексы
-        self.indexes['isbn'].add_book(book)
-        self.indexes['автор'].add_book(book)
-        self.indexes['год издания'].add_book(book)
+        # Обновляем уже построенные индексы
+        for index in self.indexes.values():
+            index.add_book(book)
+
+    def add_books(self, books: Iterable[Book]) -> None:
+        """
+        Массово добавляет книги: общая коллекция расширяется один раз, затем
+        каждый индекс достраивается отдельным проходом по пачке
+        :param books: книги которые нужно добавить
+        :return: None
+        """
+        new_books: List[Book] = []
+        for book in books:
+            if book.isbn in self.positions:
+                print(f"Книга с ISBN {book.isbn} уже есть в библиотеке")
+                continue
+            self._changed('add', book)
+            self.positions[book.isbn] = len(self.books) + len(new_books)
+            new_books.append(book)
+        self.books.extend(new_books)
+
+        for index in self.indexes.values():
+            add = index.add_book
+            for book in new_books:
+                add(book)
 
     def remove_book(self, book: Book) -> bool:
         """
@@ -37,19 +164,135 @@ class Library:
         :param book: книга, которую нужно удалить
         :return: True сли удалилась и False сли произошла ошибка
         """
-        try:
-            # Удаляем книгу из общей коллекции
-            self.books.remove(book)
-
-            # Обновляем все индексы
-            self.indexes['isbn'].remove_book(book.isbn)
-            self.indexes['автор'].remove_book(book)
-            self.indexes['год издания'].remove_book(book)
-
-            return True
-        except ValueError:
+        if book.isbn not in self.positions:
             print(f"Книга '{book.title}' автора {book.author} не найдена в библиотеке")
             return False
+        return self.remove_by_isbn(book.isbn)
+
+    def remove_by_isbn(self, isbn: str) -> bool:
+        """
+        Удаляет книгу по ISBN за O(1): на ее место в общей коллекции ставится последняя книга
+        :param isbn: ISBN книги, которую нужно удалить
+        :return: True если удалилась и False если такой книги нет
+        """
+        pos = self.positions.get(isbn)
+        if pos is None:
+            print(f"Книга с ISBN '{isbn}' не найдена в библиотеке")
+            return False
+
+        book = self.books[pos]
+        self._changed('remove', book)
+
+        del self.positions[isbn]
+        self.books.swap_remove(pos)
+        if pos < len(self.books):
+            self.positions[self.books[pos].isbn] = pos
+
+        # Обновляем уже построенные индексы
+        for index in self.indexes.values():
+            index.discard(book)
+
+        return True
+
+    def remove_where(self, predicate: Callable[[Book], bool]) -> int:
+        """
+        Удаляет все книги, подходящие под условие: общая коллекция и каждый индекс
+        сжимаются за один проход (порядок оставшихся книг сохраняется)
+        :param predicate: функция, которая возвращает True для книг на удаление
+        :return: количество удаленных книг
+        """
+        kept: List[Book] = []
+        removed: List[Book] = []
+        for book in self.books:
+            (removed if predicate(book) else kept).append(book)
+        if not removed:
+            return 0
+
+        for book in removed:
+            self._changed('remove', book)
+
+        self.books.books = kept
+        self.positions = {book.isbn: i for i, book in enumerate(kept)}
+
+        for index in self.indexes.values():
+            index.remove_books(removed)
+
+        return len(removed)
+
+    def remove_many(self, isbns: Iterable[str]) -> int:
+        """
+        Удаляет книги по списку ISBN за один проход
+        :param isbns: ISBN книг, которые нужно удалить
+        :return: количество удаленных книг
+        """
+        isbns = set(isbns)
+        return self.remove_where(lambda book: book.isbn in isbns)
+
+    def _changed(self, op: str, book: Book) -> None:
+        """
+        Сообщает об изменении кэшу, открытым снимкам и подписчикам.
+        Вызывается до изменения коллекций, чтобы снимок никогда не увидел изменение раньше записи о нем
+        :param op: 'add' или 'remove'
+        :param book: добавляемая или удаляемая книга
+        :return: None
+        """
+        self.version += 1
+
+        if self._snapshots:
+            self._history.append((self.version, op, book))
+            self._trim_history()
+        elif self._history:
+            self._history = []
+
+        if self.cache is not None:
+            self.cache.invalidate(book)
+
+        for listener in self.listeners:
+            if op == 'add':
+                listener.on_add(book)
+            else:
+                listener.on_remove(book)
+
+    def _trim_history(self) -> None:
+        """
+        Отбрасывает записи истории, которые уже не нужны ни одному открытому снимку
+        :return: None
+        """
+        oldest = min(snapshot.version for snapshot in self._snapshots)
+        if self._history[0][0] <= oldest:
+            start = bisect.bisect_right(self._history, oldest, key=lambda entry: entry[0])
+            # Новый список, а не del: читатели могли взять ссылку на старый
+            self._history = self._history[start:]
+
+    def snapshot(self) -> LibrarySnapshot:
+        """
+        Снимок библиотеки на текущий момент за O(1). Снимок ничего не копирует:
+        пока он открыт, библиотека записывает изменения в историю, и снимок
+        вычитает их из текущего состояния при чтении
+        :return: снимок только для чтения
+        """
+        snapshot = LibrarySnapshot(self, self.version)
+        self._snapshots.add(snapshot)
+        return snapshot
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Состояние для pickle (контрольные точки симуляции). Открытые снимки и их история
+        не сохраняются, из подписчиков остаются только собственные зеркала библиотеки
+        (колоночное и скетчи), внешних подписчиков (журнал и т.п.) нужно подписать заново
+        :return: словарь атрибутов
+        """
+        state = self.__dict__.copy()
+        state['listeners'] = [listener for listener in self.listeners
+                              if listener is self.columnar or listener is self.sketches]
+        del state['_snapshots']
+        state['_history'] = []
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Восстанавливает библиотеку из состояния __getstate__"""
+        self.__dict__.update(state)
+        self._snapshots = weakref.WeakSet()
 
     def search_by_isbn(self, isbn: str) -> BookCollection:
         """
@@ -57,8 +300,12 @@ class Library:
         :param isbn: isbn книги
         :return: коллекция найденных книг
         """
-        # получаем объект ISBNIndexDict и вызываем get у него, передав ему ISBN, получаем книгу с этим isbn
-        return self.indexes['isbn'].get(isbn)
+        index = self.get_index('isbn')
+        if index is not None:
+            return index.get(isbn)
+        # Без индекса хватает карты позиций
+        pos = self.positions.get(isbn)
+        return self._copies([] if pos is None else [self.books[pos]])
 
     def search_by_author(self, author: str) -> BookCollection:
         """
@@ -66,7 +313,7 @@ class Library:
         :param author: автор, чьи книги нужно найти
         :return: коллекция найденных книг
         """
-        return self.indexes['автор'].get_all_books_author(author)
+        return self._cached('author', author, lambda: self.search('author', author))
 
     def search_by_year(self, year: int) -> BookCollection:
         """
@@ -74,19 +321,104 @@ class Library:
         :param year: год издания, книги которого нужно найти
         :return: коллекция найденных книг
         """
-        return self.indexes['год издания'].get_all_books_year(year)
+        return self._cached('year', year, lambda: self.search('year', year))
 
     def search_by_genre(self, genre: str) -> BookCollection:
         """
-        Поиск по жанру
+        Поиск по жанру (без учета регистра)
         :param genre: жанр, в котором нужно найти книги
         :return: коллекция найденных книг
         """
-        res = []
-        for book in self.books:
-            if book.genre.lower() == genre.lower():
-                res.append(book)
-        return BookCollection(res)
+        genre = genre.lower()
+
+        def compute() -> BookCollection:
+            index = self.get_index('genre')
+            if index is None or isinstance(index, TextIndexDict):
+                return self._copies(book for book in self.books if book.genre.lower() == genre)
+            # Жанров мало, поэтому достаточно пройти по ключам индекса
+            res = BookCollection()
+            for key in index.keys():
+                if key.lower() == genre:
+                    res.extend(list(index.get(key)))
+            return res
+
+        return self._cached('genre', genre, compute)
+
+    def search(self, field: str, value: Any) -> BookCollection:
+        """
+        Поиск книг по равенству поля: через индекс, если он объявлен, иначе перебором
+        :param field: поле книги
+        :param value: значение поля
+        :return: коллекция найденных книг
+        """
+        index = self.get_index(field)
+        if index is not None and not isinstance(index, TextIndexDict):
+            return index.get(value)
+        return self._copies(book for book in self.books if getattr(book, field) == value)
+
+    def search_range(self, field: str, low: Any = None, high: Any = None) -> BookCollection:
+        """
+        Поиск книг, у которых значение поля в диапазоне [low, high]
+        :param field: поле книги
+        :param low: нижняя граница (None - без границы)
+        :param high: верхняя граница (None - без границы)
+        :return: коллекция найденных книг
+        """
+        index = self.get_index(field)
+        if isinstance(index, SortedIndexDict):
+            return index.range(low, high)
+        return self._copies(book for book in self.books
+                            if (low is None or getattr(book, field) >= low)
+                            and (high is None or getattr(book, field) <= high))
+
+    def search_text(self, field: str, text: str) -> BookCollection:
+        """
+        Поиск книг, в поле которых встречаются все слова запроса
+        :param field: текстовое поле книги (например 'title')
+        :param text: запрос
+        :return: коллекция найденных книг
+        """
+        index = self.get_index(field)
+        if isinstance(index, TextIndexDict):
+            return index.search(text)
+        tokens = set(TextIndexDict.tokens(text))
+        if not tokens:
+            return BookCollection([])
+        return self._copies(book for book in self.books
+                            if tokens.issubset(TextIndexDict.tokens(getattr(book, field))))
+
+    @staticmethod
+    def _copies(books: Iterable[Book]) -> BookCollection:
+        """
+        Результат поиска перебором: копии книг, как и у поиска через индекс
+        :param books: найденные книги
+        :return: коллекция копий
+        """
+        return copy.deepcopy(BookCollection(list(books)))
+
+    def _cached(self, kind: str, key: Any, compute: Callable[[], BookCollection]) -> BookCollection:
+        """
+        Достает результат поиска из кэша или вычисляет и сохраняет его
+        :param kind: тип запроса ('author', 'year' или 'genre')
+        :param key: значение, по которому ищем
+        :param compute: функция, которая выполняет поиск без кэша
+        :return: коллекция копий найденных книг
+        """
+        if self.cache is None:
+            return compute()
+
+        result = self.cache.get(kind, key)
+        if result is None:
+            # Кэш сохраняет свои копии, поэтому свежий результат compute можно отдать как есть
+            result = compute()
+            self.cache.put(kind, key, result)
+        return result
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        :return: статистика кэша поиска (пустой словарь, если кэш выключен)
+        """
+        return self.cache.stats() if self.cache is not None else {}
 
     def get_all_books(self) -> BookCollection:
         """
@@ -94,24 +426,83 @@ class Library:
         """
         return BookCollection([book for book in self.books])
 
-    def get_statistics(self) -> Dict[str, Any]:
+    def sample(self, k: int = 1, rng: random.Random | None = None) -> BookCollection:
+        """
+        Равномерно выбирает k разных книг за O(k), не копируя каталог
+        :param k: сколько книг выбрать
+        :param rng: генератор случайных чисел (по умолчанию модуль random)
+        :return: коллекция выбранных книг
+        :raises ValueError: если библиотека пуста или в ней меньше k книг
+        """
+        if not self.books:
+            raise ValueError("Библиотека пуста, выбирать не из чего")
+        rng = resolve_rng(rng)
+        if k == 1:
+            return BookCollection([self.books[rng.randrange(len(self.books))]])
+        return BookCollection([self.books[i] for i in rng.sample(range(len(self.books)), k)])
+
+    def get_statistics(self, approximate: bool = False) -> Dict[str, Any]:
         """
-        Статистика библиотеки
+        Статистика библиотеки (по колоночному зеркалу, если оно включено)
+        :param approximate: вернуть приблизительную статистику по скетчам (Library(sketches=True))
         :return: Словарь со статистикой
         """
-        authors_count = len(self.indexes['автор'])
+        if approximate:
+            if self.sketches is None:
+                raise ValueError("Приблизительная статистика не ведется, создайте Library(sketches=True)")
+            return self.sketches.summary()
+
+        books_per_author: Dict[str, int]
+        if self.columnar is not None:
+            books_per_author = self.columnar.author_counts()
+            return {
+                'total_books': len(self.books),
+                'unique_authors': len(books_per_author),
+                'years_range': sorted(self.columnar.year_histogram()),
+                'books_per_author': books_per_author
+            }
+
+        books_per_author = {}
+        # Статистика только читает: уже построенные индексы используются, новые не строятся
+        author_index = self.indexes.get('author')
+        year_index = self.indexes.get('year')
+        if author_index is not None and not isinstance(author_index, TextIndexDict):
+            books_per_author = {author: len(books) for author, books in author_index.index.items()}
+        else:
+            for book in self.books:
+                books_per_author[book.author] = books_per_author.get(book.author, 0) + 1
+        if year_index is not None and not isinstance(year_index, TextIndexDict):
+            years = set(year_index.keys())
+        else:
+            years = {book.year for book in self.books}
 
         return {
             'total_books': len(self.books),
-            'unique_authors': authors_count,
-            'years_range': sorted(list(self.indexes['год издания'].keys())) if self.indexes['год издания'] else [],
-            'books_per_author': {author: len(books) for author, books in self.indexes['автор'].items()}
+            'unique_authors': len(books_per_author),
+            'years_range': sorted(years),
+            'books_per_author': books_per_author
         }
 
-    def __repr__(self) -> str:
-        """Возвращает строковое представление библиотеки"""
-        res = f"Всего книг в библиотеке {len(self.books)}\n\n"
+    def iter_report(self) -> Iterator[str]:
+        """
+        :return: итератор по строкам отчета о всех книгах библиотеки
+        """
+        yield f"Всего книг в библиотеке {len(self.books)}\n\n"
         for i, book in enumerate(self.books):
-            res += f"{i + 1}. {book.title} ({book.genre}, {book.author}, {book.year})\n"
+            yield f"{i + 1}. {book.title} ({book.genre}, {book.author}, {book.year})\n"
+
+    def write_report(self, stream: TextIO) -> int:
+        """
+        Построчно пишет полный отчет о библиотеке в поток, не собирая его в памяти
+        :param stream: поток для записи (файл, sys.stdout, ответ сервера)
+        :return: количество записанных строк
+        """
+        count = 0
+        for line in self.iter_report():
+            stream.write(line)
+            count += 1
+        return count
 
-        return res
+    def __repr__(self) -> str:
+        """Возвращает строковое представление библиотеки (для больших библиотек - только начало)"""
+        return truncated_report(self.iter_report())
@@ -0,0 +1,224 @@
+import heapq
+import random
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+from src.books import Book
+from src.library import Library
+from src.randomness import resolve_rng
+
+
+class Loan:
+    """Выдача одной книги читателю"""
+
+    def __init__(self, isbn: str, patron: str, start: int, due: int):
+        """
+        :param isbn: ISBN выданной книги
+        :param patron: читатель
+        :param start: день выдачи
+        :param due: день, к которому книгу нужно вернуть
+        """
+        self.isbn = isbn
+        self.patron = patron
+        self.start = start
+        self.due = due
+        self.overdue = False
+
+    def __repr__(self) -> str:
+        state = "просрочена" if self.overdue else f"до {self.due} дня"
+        return f"{self.isbn} у читателя {self.patron} ({state})"
+
+
+class SimulationClock:
+    """Дискретные часы симуляции: время идет целыми днями только по команде"""
+
+    def __init__(self, start: int = 0):
+        """
+        :param start: начальный день
+        """
+        self.now = start
+
+    def tick(self, days: int = 1) -> int:
+        """
+        Переводит часы вперед
+        :param days: на сколько дней
+        :return: новый текущий день
+        """
+        if days < 0:
+            raise ValueError("Время не может идти назад")
+        self.now += days
+        return self.now
+
+
+class LoanManager:
+    """
+    Выдача и возврат книг, очереди бронирований и контроль сроков
+
+    Сроки возврата лежат в куче (due, номер, выдача), поэтому проверка просрочек
+    стоит O(log n) на каждую истекшую выдачу и не перебирает все активные выдачи.
+    Возвращенные книги из кучи сразу не удаляются: устаревшая запись пропускается,
+    когда доходит до вершины, а при большом числе таких записей куча пересобирается.
+    Менеджер подписан на библиотеку: удаление книги закрывает ее выдачу и очередь бронирований
+    """
+
+    def __init__(self, library: Library, loan_period: int = 14):
+        """
+        :param library: библиотека, книги которой выдаются
+        :param loan_period: на сколько дней выдается книга
+        """
+        if loan_period <= 0:
+            raise ValueError("Срок выдачи должен быть положительным")
+        self.library = library
+        self.loan_period = loan_period
+        self.loans: Dict[str, Loan] = {}  # ISBN -> активная выдача
+        self.holds: Dict[str, Deque[str]] = {}  # ISBN -> очередь читателей
+        self.overdue: Dict[str, Loan] = {}  # ISBN -> просроченная выдача
+        self.due_queue: List[Tuple[int, int, Loan]] = []
+        self._counter = 0  # номер выдачи, чтобы при равных сроках куча не сравнивала выдачи
+        self._stale = 0  # сколько записей в куче относятся к уже закрытым выдачам
+        # Плотный список выданных ISBN для случайного выбора за O(1)
+        self._active: List[str] = []
+        self._active_pos: Dict[str, int] = {}
+        library.add_listener(self)
+
+    def on_add(self, book: Book) -> None:
+        """Новая книга не меняет выдачи"""
+
+    def on_remove(self, book: Book) -> None:
+        """Книги больше нет в библиотеке: ее выдача и очередь бронирований снимаются"""
+        self.holds.pop(book.isbn, None)
+        if book.isbn in self.loans:
+            self._close(book.isbn)
+
+    def checkout(self, isbn: str, patron: str, now: int) -> Loan | None:
+        """
+        Выдает книгу читателю
+        :param isbn: ISBN книги
+        :param patron: читатель
+        :param now: текущий день
+        :return: выдача или None, если книги нет, она уже выдана или забронирована другим
+        """
+        if isbn not in self.library.positions or isbn in self.loans:
+            return None
+        queue = self.holds.get(isbn)
+        if queue and queue[0] != patron:
+            return None
+        if queue:
+            queue.popleft()
+            if not queue:
+                del self.holds[isbn]
+        return self._open(isbn, patron, now)
+
+    def _open(self, isbn: str, patron: str, now: int) -> Loan:
+        """Заводит выдачу и ставит ее срок в кучу"""
+        loan = Loan(isbn, patron, now, now + self.loan_period)
+        self.loans[isbn] = loan
+        self._counter += 1
+        heapq.heappush(self.due_queue, (loan.due, self._counter, loan))
+        self._active_pos[isbn] = len(self._active)
+        self._active.append(isbn)
+        return loan
+
+    def return_book(self, isbn: str, now: int) -> Loan | None:
+        """
+        Принимает книгу. Если на нее есть бронь, книга сразу выдается первому в очереди
+        :param isbn: ISBN книги
+        :param now: текущий день
+        :return: новая выдача по брони или None
+        """
+        if isbn not in self.loans:
+            print(f"Книга с ISBN '{isbn}' не выдана")
+            return None
+        self._close(isbn)
+
+        queue = self.holds.get(isbn)
+        if queue and isbn in self.library.positions:
+            return self.checkout(isbn, queue[0], now)
+        return None
+
+    def _close(self, isbn: str) -> Loan:
+        """
+        Закрывает активную выдачу
+        :param isbn: ISBN выданной книги
+        :return: закрытая выдача
+        """
+        loan = self.loans.pop(isbn)
+        if loan.overdue:
+            del self.overdue[isbn]
+        else:
+            # Просроченная выдача уже снята с кучи, остальные там остаются устаревшей записью
+            self._stale += 1
+            self._compact()
+
+        pos = self._active_pos.pop(isbn)
+        last = self._active.pop()
+        if pos < len(self._active):
+            self._active[pos] = last
+            self._active_pos[last] = pos
+        return loan
+
+    def place_hold(self, isbn: str, patron: str) -> int:
+        """
+        Ставит читателя в очередь на выданную книгу
+        :param isbn: ISBN книги
+        :param patron: читатель
+        :return: место в очереди (с 1), 0 если книги нет в библиотеке или она уже у этого читателя
+        """
+        if isbn not in self.library.positions:
+            return 0
+        loan = self.loans.get(isbn)
+        if loan is None:
+            # Бронь на свободную книгу некому снять возвратом, и книга осталась бы закрыта для всех
+            raise ValueError(f"Книга с ISBN '{isbn}' не выдана, ее можно взять без брони")
+        if loan.patron == patron:
+            return 0
+        queue = self.holds.setdefault(isbn, deque())
+        if patron not in queue:
+            queue.append(patron)
+        return queue.index(patron) + 1
+
+    def expire_overdue(self, now: int) -> List[Loan]:
+        """
+        Отмечает просроченными все выдачи со сроком до текущего дня
+        :param now: текущий день
+        :return: выдачи, ставшие просроченными
+        """
+        expired = []
+        while self.due_queue and self.due_queue[0][0] < now:
+            _, _, loan = heapq.heappop(self.due_queue)
+            if self.loans.get(loan.isbn) is not loan:
+                self._stale -= 1
+                continue
+            loan.overdue = True
+            self.overdue[loan.isbn] = loan
+            expired.append(loan)
+        return expired
+
+    def overdue_loans(self) -> List[Loan]:
+        """
+        :return: активные просроченные выдачи
+        """
+        return list(self.overdue.values())
+
+    def _compact(self) -> None:
+        """Пересобирает кучу, если в ней больше половины устаревших записей"""
+        if self._stale > 64 and self._stale * 2 > len(self.due_queue):
+            self.due_queue = [entry for entry in self.due_queue if self.loans.get(entry[2].isbn) is entry[2]]
+            heapq.heapify(self.due_queue)
+            self._stale = 0
+
+    def sample_loan(self, rng: random.Random | None = None) -> Loan | None:
+        """
+        Случайная активная выдача за O(1)
+        :param rng: генератор случайных чисел (по умолчанию модуль random)
+        :return: выдача или None, если выдач нет
+        """
+        if not self._active:
+            return None
+        rng = resolve_rng(rng)
+        return self.loans[self._active[rng.randrange(len(self._active))]]
+
+    def __len__(self) -> int:
+        """
+        :return: количество активных выдач
+        """
+        return len(self.loans)
@@ -1,9 +1,78 @@
-from src.simulation import run_simulation
+import argparse
+import logging
+import sys
+from typing import List
+from src.simulation import run_simulation, WORKLOADS
 
 
-def main():
+def parse_args(argv: List[str]) -> argparse.Namespace:
     """
-    Точка входа для запуска программы
+    Разбирает аргументы командной строки
+    :param argv: аргументы без имени программы
+    :return: разобранные аргументы
+    """
+    parser = argparse.ArgumentParser(description="Симуляция библиотеки без интерактивного ввода")
+    parser.add_argument('--steps', type=int, default=20, help="количество шагов симуляции")
+    parser.add_argument('--seed', type=int, default=None, help="seed для генератора случайных чисел")
+    parser.add_argument('--workload', choices=list(WORKLOADS), default=None,
+                        help="профиль нагрузки (по умолчанию uniform)")
+    parser.add_argument('--catalog-size', type=int, default=0,
+                        help="сколько случайных книг добавить в каталог перед началом")
+    parser.add_argument('--profile', metavar='DIR', default=None,
+                        help="каталог для отчетов cProfile, tracemalloc и стеков для flamegraph")
+    parser.add_argument('--bloom-error-rate', type=float, default=None, metavar='P',
+                        help="поставить перед индексом ISBN фильтр Блума с такой долей ложных срабатываний")
+    parser.add_argument('--quiet', action='store_true', help="не выводить лог шагов")
+    parser.add_argument('--checkpoint-every', type=int, default=None, metavar='N',
+                        help="сохранять контрольную точку каждые N шагов")
+    parser.add_argument('--checkpoint-dir', default='.', help="каталог для контрольных точек (создается, если его нет)")
+    parser.add_argument('--resume', metavar='FILE', default=None,
+                        help="продолжить симуляцию с контрольной точки (до --steps шагов всего)")
+    args = parser.parse_args(argv)
+    if args.steps < 0:
+        parser.error("Количество шагов не может быть отрицательным")
+    if args.catalog_size < 0:
+        parser.error("Размер каталога не может быть отрицательным")
+    if args.checkpoint_every is not None and args.checkpoint_every <= 0:
+        parser.error("Интервал контрольных точек должен быть положительным")
+    if args.bloom_error_rate is not None and not 0 < args.bloom_error_rate < 1:
+        parser.error("Доля ложных срабатываний фильтра Блума должна быть между 0 и 1")
+    if args.resume is not None:
+        # Seed, профиль нагрузки и каталог (вместе с его индексами) берутся из контрольной точки
+        given = {'--seed': args.seed is not None, '--workload': args.workload is not None,
+                 '--catalog-size': args.catalog_size > 0, '--bloom-error-rate': args.bloom_error_rate is not None}
+        ignored = [option for option, used in given.items() if used]
+        if ignored:
+            parser.error(f"{', '.join(ignored)} нельзя задать вместе с --resume, они берутся из контрольной точки")
+    return args
+
+
+def run_headless(args: argparse.Namespace) -> None:
+    """
+    Запускает симуляцию с параметрами из командной строки
+    :param args: разобранные аргументы
+    """
+    if args.quiet:
+        logging.getLogger("For simulation").setLevel(logging.WARNING)
+
+    def simulate() -> None:
+        run_simulation(steps=args.steps, seed=args.seed, workload=args.workload, catalog_size=args.catalog_size,
+                       checkpoint_every=args.checkpoint_every, checkpoint_dir=args.checkpoint_dir,
+                       resume_from=args.resume, bloom_error_rate=args.bloom_error_rate)
+
+    if args.profile is None:
+        simulate()
+        return
+
+    # Импорт здесь, чтобы обычный запуск не платил за загрузку профилировщиков
+    from src.profiling import profile_run
+    for kind, path in profile_run(simulate, args.profile).items():
+        print(f"{kind}: {path}")
+
+
+def interactive() -> None:
+    """
+    Запрашивает параметры симуляции у пользователя и запускает ее
     """
     print("Начинаем симуляцию библиотеки (ﾉ◕ヮ◕)ﾉ*:･ﾟ✧ ")
 
@@ -27,5 +96,19 @@ def main():
 
     run_simulation(steps=steps, seed=seed)
 
+
+def main(argv: List[str] | None = None):
+    """
+    Точка входа для запуска программы: без аргументов - интерактивный режим,
+    с аргументами (--steps, --seed, --workload, --catalog-size, --profile, --resume и т.д.) - без ввода
+    :param argv: аргументы командной строки (по умолчанию sys.argv[1:])
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        interactive()
+    else:
+        run_headless(parse_args(argv))
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,118 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict
+
+
+class StackSampler(threading.Thread):
+    """
+    Сэмплирующий профилировщик: фоновый поток через равные промежутки снимает
+    стек заданного потока (sys._current_frames) и считает одинаковые стеки.
+    Результат пишется в collapsed-формате, который понимают flamegraph.pl и speedscope
+    """
+
+    def __init__(self, thread_id: int | None = None, interval: float = 0.005) -> None:
+        """
+        :param thread_id: поток, который нужно сэмплировать (по умолчанию текущий)
+        :param interval: промежуток между снимками в секундах
+        """
+        super().__init__(daemon=True)
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        """Снимает стеки, пока не вызван stop"""
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        """Останавливает сэмплирование и ждет завершения потока"""
+        self._stop_event.set()
+        self.join()
+
+    def write_collapsed(self, path: str) -> int:
+        """
+        Записывает стеки в collapsed-формате: 'кадр;кадр;кадр количество' на строку
+        :param path: путь к файлу
+        :return: количество снимков
+        """
+        with open(path, 'w', encoding='utf-8') as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+        return sum(self.stacks.values())
+
+
+def profile_run(func: Callable[[], Any], output_dir: str, top: int = 30,
+                interval: float = 0.005) -> Dict[str, str]:
+    """
+    Выполняет функцию под cProfile, tracemalloc и сэмплирующим профилировщиком
+    и складывает отчеты в каталог.
+    Функция выполняется дважды: сначала под cProfile и tracemalloc, затем под сэмплером.
+    С Python 3.12 cProfile записывает вызовы всех потоков, поэтому при общем запуске
+    ожидание потока сэмплера вытесняло бы из отчета функции программы.
+    tracemalloc заметно замедляет выделение памяти, поэтому абсолютные времена
+    в отчете cProfile завышены, сравнивать стоит доли функций
+    :param func: функция без аргументов (например, запуск симуляции)
+    :param output_dir: каталог для отчетов (создается, если его нет)
+    :param top: сколько строк оставлять в текстовых отчетах
+    :param interval: промежуток между снимками стека в секундах
+    :return: вид отчета -> путь к файлу
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {
+        'pstats': os.path.join(output_dir, 'profile.pstats'),
+        'profile': os.path.join(output_dir, 'profile.txt'),
+        'memory': os.path.join(output_dir, 'tracemalloc.txt'),
+        'stacks': os.path.join(output_dir, 'stacks.collapsed'),
+    }
+
+    profiler = cProfile.Profile()
+    tracemalloc.start(25)
+    profiler.enable()
+    try:
+        func()
+    finally:
+        profiler.disable()
+        memory = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    sampler = StackSampler(interval=interval)
+    sampler.start()
+    try:
+        func()
+    finally:
+        sampler.stop()
+
+    profiler.dump_stats(paths['pstats'])
+    text = io.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(top)
+    with open(paths['profile'], 'w', encoding='utf-8') as file:
+        file.write(text.getvalue())
+
+    memory = memory.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+    ])
+    with open(paths['memory'], 'w', encoding='utf-8') as file:
+        file.write(f"Пик памяти: {peak / 1024:.1f} KiB\n")
+        for stat in memory.statistics('lineno')[:top]:
+            file.write(f"{stat}\n")
+
+    sampler.write_collapsed(paths['stacks'])
+    return paths
@@ -0,0 +1,15 @@
+import random
+from typing import cast
+
+
+def resolve_rng(rng: random.Random | None = None) -> random.Random:
+    """
+    Генератор случайных чисел по умолчанию - сам модуль random. Его глобальное состояние
+    задает random.seed, поэтому запуски симуляции с seed остаются воспроизводимыми
+    :param rng: переданный генератор или None
+    :return: генератор, которым нужно пользоваться
+    """
+    if rng is None:
+        # У модуля random те же функции, что у экземпляра Random (это методы его скрытого экземпляра)
+        return cast(random.Random, random)
+    return rng
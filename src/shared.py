@@ -0,0 +1,349 @@
+import bisect
+import struct
+import sys
+from array import array
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Set, Tuple
+from src.books import Book
+from src.collection import BookCollection
+
+MAGIC = b'LIBSHM01'
+
+# Разделы сегмента в фиксированном порядке. Строковые колонки хранятся как
+# смещения (int64, n + 1 штука) и склеенные байты UTF-8, индексы - как массивы номеров строк
+SECTIONS = (
+    'years',
+    'title_offsets', 'titles',
+    'author_offsets', 'authors',
+    'genre_offsets', 'genres',
+    'isbn_offsets', 'isbns',
+    'isbn_order',  # номера строк, отсортированные по ISBN
+    'author_key_offsets', 'author_keys',  # различные авторы по возрастанию
+    'author_starts', 'author_rows',  # строки каждого автора подряд, author_starts - границы групп
+    'year_keys', 'year_starts', 'year_rows',  # то же для годов
+)
+NUMERIC = {
+    'years': 'i', 'isbn_order': 'i', 'author_rows': 'i', 'year_keys': 'i', 'year_rows': 'i',
+    'author_starts': 'q', 'year_starts': 'q',
+    'title_offsets': 'q', 'author_offsets': 'q', 'genre_offsets': 'q', 'isbn_offsets': 'q',
+    'author_key_offsets': 'q',
+}
+# Сегменты, созданные этим процессом: их регистрация в resource_tracker принадлежит владельцу
+_owned: Set[str] = set()
+HEADER = struct.Struct('<8sQ')
+ENTRY = struct.Struct('<QQ')
+
+
+def _string_column(values: List[str]) -> Tuple[array, bytes]:
+    """
+    :param values: строки
+    :return: смещения и склеенные байты UTF-8
+    """
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = array('q', [0])
+    total = 0
+    for item in encoded:
+        total += len(item)
+        offsets.append(total)
+    return offsets, b''.join(encoded)
+
+
+def _buffer(memory: shared_memory.SharedMemory) -> memoryview:
+    """
+    :param memory: сегмент
+    :return: буфер сегмента (None у SharedMemory бывает только после close)
+    """
+    buf = memory.buf
+    if buf is None:
+        raise ValueError(f"Сегмент '{memory.name}' уже закрыт")
+    return buf
+
+
+def _groups(keys: List[Any]) -> Tuple[List[Any], array, array]:
+    """
+    Группирует строки по ключу
+    :param keys: ключ каждой строки
+    :return: отсортированные различные ключи, границы групп и номера строк по группам
+    """
+    rows = sorted(range(len(keys)), key=keys.__getitem__)
+    distinct: List[Any] = []
+    starts = array('q')
+    for position, row in enumerate(rows):
+        if not distinct or keys[row] != distinct[-1]:
+            distinct.append(keys[row])
+            starts.append(position)
+    starts.append(len(rows))
+    return distinct, starts, array('i', rows)
+
+
+class SharedCatalog:
+    """
+    Каталог библиотеки, выгруженный в один сегмент multiprocessing.shared_memory
+
+    Владелец создает сегмент и в конце вызывает unlink. Другие процессы подключаются
+    к нему по имени через SharedLibraryView и читают одну физическую копию
+    """
+
+    def __init__(self, memory: shared_memory.SharedMemory) -> None:
+        """
+        :param memory: созданный сегмент
+        """
+        self.memory = memory
+        self.name = memory.name
+
+    @classmethod
+    def create(cls, library: Any, name: str | None = None) -> 'SharedCatalog':
+        """
+        Выгружает книги и индексы по ISBN, автору и году в общий сегмент
+        :param library: библиотека (или любой объект с books)
+        :param name: имя сегмента (по умолчанию выбирается системой)
+        :return: владелец сегмента
+        """
+        books = list(library.books)
+        sections: Dict[str, Any] = {'years': array('i', [book.year for book in books])}
+        for field in ('title', 'author', 'genre', 'isbn'):
+            offsets, blob = _string_column([getattr(book, field) for book in books])
+            sections[f'{field}_offsets'] = offsets
+            sections[f'{field}s'] = blob
+
+        isbn_keys = [book.isbn.encode('utf-8') for book in books]
+        sections['isbn_order'] = array('i', sorted(range(len(books)), key=isbn_keys.__getitem__))
+
+        author_keys = [book.author.encode('utf-8') for book in books]
+        authors, sections['author_starts'], sections['author_rows'] = _groups(author_keys)
+        sections['author_key_offsets'], sections['author_keys'] = _string_column(
+            [author.decode('utf-8') for author in authors])
+
+        years, sections['year_starts'], sections['year_rows'] = _groups([book.year for book in books])
+        sections['year_keys'] = array('i', years)
+
+        # Разделы выравниваются по 8 байт, чтобы их можно было читать как массивы чисел
+        table_size = HEADER.size + ENTRY.size * len(SECTIONS)
+        layout = []
+        offset = table_size
+        for section in SECTIONS:
+            data = memoryview(sections[section]).cast('B')
+            offset = (offset + 7) // 8 * 8
+            layout.append((offset, data))
+            offset += len(data)
+
+        memory = shared_memory.SharedMemory(name=name, create=True, size=max(offset, 1))
+        buf = _buffer(memory)
+        HEADER.pack_into(buf, 0, MAGIC, len(books))
+        for i, (start, data) in enumerate(layout):
+            ENTRY.pack_into(buf, HEADER.size + i * ENTRY.size, start, len(data))
+            buf[start:start + len(data)] = data
+        _owned.add(memory.name)
+        return cls(memory)
+
+    def view(self) -> 'SharedLibraryView':
+        """
+        :return: представление только для чтения в этом же процессе
+        """
+        return SharedLibraryView(self.name)
+
+    def close(self) -> None:
+        """Закрывает сегмент в этом процессе"""
+        self.memory.close()
+
+    def unlink(self) -> None:
+        """Удаляет сегмент из системы (вызывает владелец, когда читатели больше не нужны)"""
+        self.memory.unlink()
+        _owned.discard(self.name)
+
+    def __enter__(self) -> 'SharedCatalog':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+        self.unlink()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Подключается к существующему сегменту, не передавая его resource_tracker этого процесса
+    (иначе сегмент удалился бы при выходе первого же читателя)
+    :param name: имя сегмента
+    :return: сегмент
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    from multiprocessing import resource_tracker
+    memory = shared_memory.SharedMemory(name=name)
+    if memory.name in _owned:
+        # Регистрация одна на процесс, снимать ее должен unlink владельца
+        return memory
+    # Трекер регистрирует POSIX-имя со слешем в начале, а name возвращается без него
+    resource_tracker.unregister('/' + memory.name, 'shared_memory')
+    return memory
+
+
+class SharedLibraryView:
+    """
+    Представление библиотеки только для чтения поверх общего сегмента
+
+    Поддерживает те же запросы, что и Library. Книги собираются из колонок при чтении,
+    поэтому процесс держит в памяти только результаты своих запросов
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        :param name: имя сегмента, созданного SharedCatalog.create
+        """
+        self.memory = _attach(name)
+        # Колонки строятся поверх буфера только для чтения, чтобы представление не могло
+        # изменить данные, которые видят остальные процессы
+        buf = self.buf = _buffer(self.memory).toreadonly()
+        magic, self.size = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            buf.release()
+            self.memory.close()
+            raise ValueError(f"Сегмент '{name}' не содержит каталог библиотеки")
+
+        self.columns: Dict[str, memoryview] = {}
+        for i, section in enumerate(SECTIONS):
+            start, length = ENTRY.unpack_from(buf, HEADER.size + i * ENTRY.size)
+            column = buf[start:start + length]
+            if section not in NUMERIC:
+                self.columns[section] = column
+            elif NUMERIC[section] == 'i':
+                self.columns[section] = column.cast('i')
+            else:
+                self.columns[section] = column.cast('q')
+
+    def _bytes(self, field: str, row: int) -> bytes:
+        """
+        :return: значение строковой колонки в строке row (в байтах UTF-8)
+        """
+        offsets = self.columns[f'{field}_offsets']
+        return bytes(self.columns[f'{field}s'][offsets[row]:offsets[row + 1]])
+
+    def _string(self, field: str, row: int) -> str:
+        """
+        :return: значение строковой колонки в строке row
+        """
+        offsets = self.columns[f'{field}_offsets']
+        return str(self.columns[f'{field}s'][offsets[row]:offsets[row + 1]], 'utf-8')
+
+    def _author_key(self, i: int) -> bytes:
+        """
+        :return: i-й автор в отсортированном словаре (в байтах)
+        """
+        offsets = self.columns['author_key_offsets']
+        return bytes(self.columns['author_keys'][offsets[i]:offsets[i + 1]])
+
+    def book(self, row: int) -> Book:
+        """
+        :param row: номер строки
+        :return: книга из этой строки
+        """
+        return Book(self._string('title', row), self._string('author', row), self.columns['years'][row],
+                    self._string('genre', row), self._string('isbn', row))
+
+    def _rows(self, rows) -> BookCollection:
+        """
+        :return: коллекция книг из заданных строк
+        """
+        return BookCollection([self.book(row) for row in rows])
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[Book]:
+        return (self.book(row) for row in range(self.size))
+
+    def get_all_books(self) -> BookCollection:
+        """
+        :return: Коллекция всех книг
+        """
+        return self._rows(range(self.size))
+
+    def search_by_isbn(self, isbn: str) -> BookCollection:
+        """
+        Поиск книг по isbn (двоичный поиск по отсортированному порядку)
+        :param isbn: isbn книги
+        :return: коллекция найденных книг
+        """
+        key = isbn.encode('utf-8')
+        order = self.columns['isbn_order']
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self._bytes('isbn', order[middle]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.size and self._bytes('isbn', order[low]) == key:
+            return self._rows([order[low]])
+        return BookCollection([])
+
+    def search_by_author(self, author: str) -> BookCollection:
+        """
+        Поиск книг по автору
+        :param author: автор, чьи книги нужно найти
+        :return: коллекция найденных книг
+        """
+        key = author.encode('utf-8')
+        count = len(self.columns['author_starts']) - 1
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if self._author_key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == count or self._author_key(low) != key:
+            return BookCollection([])
+        starts = self.columns['author_starts']
+        return self._rows(self.columns['author_rows'][starts[low]:starts[low + 1]])
+
+    def search_by_year(self, year: int) -> BookCollection:
+        """
+        Поиск по году издания
+        :param year: год издания, книги которого нужно найти
+        :return: коллекция найденных книг
+        """
+        keys = self.columns['year_keys']
+        i = bisect.bisect_left(keys, year)
+        if i == len(keys) or keys[i] != year:
+            return BookCollection([])
+        starts = self.columns['year_starts']
+        return self._rows(self.columns['year_rows'][starts[i]:starts[i + 1]])
+
+    def search_by_genre(self, genre: str) -> BookCollection:
+        """
+        Поиск по жанру (без учета регистра, перебором колонки жанров)
+        :param genre: жанр, в котором нужно найти книги
+        :return: коллекция найденных книг
+        """
+        genre = genre.lower()
+        return self._rows([row for row in range(self.size) if self._string('genre', row).lower() == genre])
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Статистика библиотеки
+        :return: Словарь со статистикой (в том же формате, что у Library)
+        """
+        starts = self.columns['author_starts']
+        books_per_author = {self._author_key(i).decode('utf-8'): starts[i + 1] - starts[i]
+                            for i in range(len(starts) - 1)}
+        return {
+            'total_books': self.size,
+            'unique_authors': len(books_per_author),
+            'years_range': self.columns['year_keys'].tolist(),
+            'books_per_author': books_per_author
+        }
+
+    def close(self) -> None:
+        """Отключается от сегмента"""
+        for column in self.columns.values():
+            column.release()
+        self.columns = {}
+        self.buf.release()
+        self.memory.close()
+
+    def __enter__(self) -> 'SharedLibraryView':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
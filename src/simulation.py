@@ -1,95 +1,205 @@
+import gc
+import os
 import random
+from typing import Dict, List
 from src.library import Library
 from src.books import Book
+from src.loans import LoanManager, SimulationClock
+from src.randomness import resolve_rng
+from src.checkpoint import checkpoint_path, load_checkpoint, save_checkpoint
 from src.logger import setup_logging
 
 logger = setup_logging()
 
-def random_book() -> Book:
-    """Создает рандомную книгу"""
-
-    titles = [
-        "Гарри Поттер и философский камень",
-        "1984", "Лолита", "Остров сокровищ", "Маленький принц",
-        "Портрет Дориана Грея", "Властелин колец", "Коллекционер"
-    ]
-
-    authors = [
-        "Лев Николаевич Толстой", "Фёдор Михайлович Достоевский",
-        "Михаил Афанасьевич Булгаков", "Александр Сергеевич Пушкин",
-        "Уильям Шекспир", "Джордж Оруэлл", "Рэй Брэдбери", "Джейн Остин"
-    ]
-
-    genres = [
-        "Роман", "Драма", "Фэнтези", "Научпоп", "Нон-фикшн",
-        "Детектив", "Поэзия", "Классика", "Трагедия"
-    ]
+TITLES = [
+    "Гарри Поттер и философский камень",
+    "1984", "Лолита", "Остров сокровищ", "Маленький принц",
+    "Портрет Дориана Грея", "Властелин колец", "Коллекционер"
+]
+
+AUTHORS = [
+    "Лев Николаевич Толстой", "Фёдор Михайлович Достоевский",
+    "Михаил Афанасьевич Булгаков", "Александр Сергеевич Пушкин",
+    "Уильям Шекспир", "Джордж Оруэлл", "Рэй Брэдбери", "Джейн Остин"
+]
+
+GENRES = [
+    "Роман", "Драма", "Фэнтези", "Научпоп", "Нон-фикшн",
+    "Детектив", "Поэзия", "Классика", "Трагедия"
+]
+
+PATRONS = ["Анна", "Борис", "Вера", "Глеб", "Дарья", "Егор"]
+
+YEARS = range(1600, 2026)
+ISBNS = range(1000000000, 10000000000)
+
+EVENTS = [
+    "Добавить книгу",
+    "Удалить книгу",
+    "Найти книги по автору",
+    "Найти книги по жанру",
+    "Найти книги по году",
+    "Найти книгу по isbn",
+    "Попытка получить книгу, которой нет",
+    "Выдать книгу",
+    "Вернуть книгу"
+]
+
+# Профили нагрузки: веса событий в порядке EVENTS (None - все события равновероятны)
+WORKLOADS: Dict[str, List[int] | None] = {
+    'uniform': None,
+    'read-heavy': [1, 1, 5, 5, 5, 10, 5, 1, 1],
+    'write-heavy': [10, 8, 1, 1, 1, 1, 1, 1, 1],
+    'loans': [1, 1, 1, 1, 1, 1, 1, 8, 8],
+}
+
+
+def random_book(rng: random.Random | None = None) -> Book:
+    """
+    Создает рандомную книгу
+    :param rng: генератор случайных чисел (по умолчанию модуль random)
+    :return: книга
+    """
+    rng = resolve_rng(rng)
 
-    title = random.choice(titles)
-    author = random.choice(authors)
-    year = random.randint(1600, 2025)
-    genre = random.choice(genres)
-    isbn = f"{random.randint(1000000000, 9999999999)}"
+    title = rng.choice(TITLES)
+    author = rng.choice(AUTHORS)
+    year = rng.randint(1600, 2025)
+    genre = rng.choice(GENRES)
+    isbn = f"{rng.randint(1000000000, 9999999999)}"
 
     return Book(title=title, author=author, year=year, genre=genre, isbn=isbn)
 
 
-def run_simulation(steps: int = 20, seed: int | None = None) -> None:
+def random_books(n: int, rng: random.Random | None = None, unique_isbns: bool = True) -> List[Book]:
+    """
+    Создает сразу n рандомных книг: каждое поле выбирается для всех книг одним вызовом
+    :param n: количество книг
+    :param rng: генератор случайных чисел (с одинаковым seed результат одинаковый)
+    :param unique_isbns: гарантировать, что ISBN не повторяются
+    :return: список книг (можно сразу передать в Library.add_books)
+    """
+    rng = resolve_rng(rng)
+
+    titles = rng.choices(TITLES, k=n)
+    authors = rng.choices(AUTHORS, k=n)
+    years = rng.choices(YEARS, k=n)
+    genres = rng.choices(GENRES, k=n)
+    # sample по range выбирает без повторов, не создавая сам диапазон
+    isbns = rng.sample(ISBNS, n) if unique_isbns else rng.choices(ISBNS, k=n)
+
+    # Миллионы новых объектов без мусора запускают сборщик циклов снова и снова,
+    # поэтому на время сборки списка он выключается
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return [Book(title, author, year, genre, str(isbn))
+                for title, author, year, genre, isbn in zip(titles, authors, years, genres, isbns)]
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def run_simulation(steps: int = 20, seed: int | None = None, workload: str | List[int] | None = None,
+                   catalog_size: int = 0, checkpoint_every: int | None = None,
+                   checkpoint_dir: str = '.', resume_from: str | None = None,
+                   bloom_error_rate: float | None = None) -> None:
     """
     Симуляция библиотеки
     :param steps: сколько щагов будет выполнено
     :param seed: инициализации генератора псевдослучайных чисел
+    :param workload: профиль нагрузки из WORKLOADS или свои веса событий в порядке EVENTS
+    :param catalog_size: сколько случайных книг добавить в каталог перед началом
+    :param checkpoint_every: сохранять контрольную точку каждые столько шагов (None - не сохранять)
+    :param checkpoint_dir: каталог для контрольных точек (создается, если его нет)
+    :param resume_from: контрольная точка, с которой продолжить симуляцию. Seed, профиль нагрузки
+        и начальный каталог берутся из нее, и шаги после нее совпадают с полным запуском
+    :param bloom_error_rate: доля ложных срабатываний фильтра Блума перед индексом ISBN
+        (None - без фильтра; в памяти поиск по индексу дешевле проверки фильтра)
     :return: None
     """
-    if seed is not None:
-        random.seed(seed)
-
-    library = Library()
-
-    logger.info(f"Начало симуляции библиотеки ( будет выполнено {steps} шагов ) ")
-
-    # Добавляем несколько начальных книг, чтобы было над чем производить действия
-    start_books = [
-        Book("Оно", "Стивен Кинг", 1986, "Ужасы", "978012345699"),
-        Book("Сияние", "Стивен Кинг", 1977, "Роман", "978098765431"),
-        Book("Метро 2033", "Дмитрий Глуховский", 2005, "Фантастика", "9780543210987"),
-        Book("Властелин колец: Братство кольца", "Дж.Р.Р. Толкин", 1954, "Фэнтези", "978012345702"),
-        Book("Убить пересмешника", "Харпер Ли", 1960, "Роман", "978012345703"),
-        Book("Ромео и Джульетта", "Уильям Шекспир", 1597, "Трагедия", "978012345713"),
-        Book("Граф Монте-Кристо", "Александр Дюма", 1844, "Приключения", "978012345710"),
-        Book("Отрочество", "Лев Николаевич Толстой", 1854, "Роман", "978012345707"),
-
-    ]
-
-    # Подготовка к началу симуляции, добавляем стартовые книги
-    for book in start_books:
-        library.add_book(book)
-        logger.info(f"Шаг 0: Добавлена начальная книга: {book}")
+    if checkpoint_every is not None and checkpoint_every <= 0:
+        raise ValueError("Интервал контрольных точек должен быть положительным")
+    weights: List[int] | None
+    if isinstance(workload, str):
+        if workload not in WORKLOADS:
+            raise ValueError(f"Неизвестный профиль нагрузки '{workload}', есть: {', '.join(WORKLOADS)}")
+        weights = WORKLOADS[workload]
+    else:
+        weights = workload
+    if weights is not None and len(weights) != len(EVENTS):
+        raise ValueError(f"Нужно {len(EVENTS)} весов событий, передано {len(weights)}")
+
+    if resume_from is not None:
+        state = load_checkpoint(resume_from)
+        library, loans, clock, weights = state['library'], state['loans'], state['clock'], state['weights']
+        random.setstate(state['random'])
+        # Внешние подписчики в контрольную точку не попадают, выдачи подписываются заново
+        library.add_listener(loans)
+        first_step = state['step'] + 1
+        logger.info(f"Продолжение симуляции с шага {first_step} ( всего {steps} шагов ) ")
+    else:
+        if seed is not None:
+            random.seed(seed)
+
+        library = Library(cache_size=128)
+        if bloom_error_rate is not None:
+            library.create_index('isbn', bloom_error_rate=bloom_error_rate)
+        loans = LoanManager(library)
+        # Один шаг симуляции - один день
+        clock = SimulationClock()
+
+        logger.info(f"Начало симуляции библиотеки ( будет выполнено {steps} шагов ) ")
+
+        # Добавляем несколько начальных книг, чтобы было над чем производить действия
+        start_books = [
+            Book("Оно", "Стивен Кинг", 1986, "Ужасы", "978012345699"),
+            Book("Сияние", "Стивен Кинг", 1977, "Роман", "978098765431"),
+            Book("Метро 2033", "Дмитрий Глуховский", 2005, "Фантастика", "9780543210987"),
+            Book("Властелин колец: Братство кольца", "Дж.Р.Р. Толкин", 1954, "Фэнтези", "978012345702"),
+            Book("Убить пересмешника", "Харпер Ли", 1960, "Роман", "978012345703"),
+            Book("Ромео и Джульетта", "Уильям Шекспир", 1597, "Трагедия", "978012345713"),
+            Book("Граф Монте-Кристо", "Александр Дюма", 1844, "Приключения", "978012345710"),
+            Book("Отрочество", "Лев Николаевич Толстой", 1854, "Роман", "978012345707"),
+
+        ]
+
+        # Подготовка к началу симуляции, добавляем стартовые книги
+        for book in start_books:
+            library.add_book(book)
+            logger.info(f"Шаг 0: Добавлена начальная книга: {book}")
+
+        if catalog_size > 0:
+            library.add_books(random_books(catalog_size))
+            logger.info(f"Шаг 0: Добавлено случайных книг: {catalog_size}")
+        first_step = 1
+
+    if checkpoint_every is not None:
+        # Каталог создается до начала шагов, чтобы первая же контрольная точка не упала
+        os.makedirs(checkpoint_dir, exist_ok=True)
 
     # Основной цикл симуляции
-    for step in range(1, steps + 1):
-
-        type_of_event = random.choice([
-            "Добавить книгу",
-            "Удалить книгу",
-            "Найти книги по автору",
-            "Найти книги по жанру",
-            "Найти книги по году",
-            "Найти книгу по isbn",
-            "Попытка получить книгу, которой нет"
-        ])
+    for step in range(first_step, steps + 1):
+        clock.tick()
+
+        if weights is None:
+            type_of_event = random.choice(EVENTS)
+        else:
+            type_of_event = random.choices(EVENTS, weights)[0]
 
         logger.info(f"Шаг {step}: {type_of_event}")
 
+        for expired in loans.expire_overdue(clock.now):
+            logger.info(f"       Просрочена выдача: {expired}")
+
         if type_of_event == "Добавить книгу":
             new_book = random_book()
             library.add_book(new_book)
             logger.info(f"       Добавлена книга: {new_book}")
 
         elif type_of_event == "Удалить книгу":
-            if len(library.get_all_books()) > 0:
-                books_list = list(library.get_all_books())
-                book_to_remove = random.choice(books_list)
+            if len(library.books) > 0:
+                book_to_remove = library.sample()[0]
                 success = library.remove_book(book_to_remove)
                 if success:
                     logger.info(f"       Удалена книга: {book_to_remove}")
@@ -104,7 +214,7 @@ def run_simulation(steps: int = 20, seed: int | None = None) -> None:
             stata = library.get_statistics()
             if stata['unique_authors'] > 0:
 
-                authors = list(library.indexes['автор'].keys())
+                authors = list(stata['books_per_author'])
 
                 if authors:
                     search_author = random.choice(authors)
@@ -117,9 +227,7 @@ def run_simulation(steps: int = 20, seed: int | None = None) -> None:
                 logger.info("       Нет доступных авторов для поиска")
 
         elif type_of_event == "Найти книги по жанру":
-            genres = ["Роман", "Драма", "Фэнтези", "Научпоп", "Нон-фикшн",
-            "Детектив", "Поэзия", "Классика", "Трагедия"]
-            search_genre = random.choice(genres)
+            search_genre = random.choice(GENRES)
             found_books = library.search_by_genre(search_genre)
             logger.info(f"       Поиск книг жанра '{search_genre}': найдено {len(found_books)} книг")
             # Показываем только первые 2 книги
@@ -142,9 +250,8 @@ def run_simulation(steps: int = 20, seed: int | None = None) -> None:
                 logger.info("       Нет годов для поиска")
 
         elif type_of_event == "Найти книгу по isbn":
-            if len(library.get_all_books()) > 0:
-                books_list = list(library.get_all_books())
-                book_to_search = random.choice(books_list)
+            if len(library.books) > 0:
+                book_to_search = library.sample()[0]
                 found_books = library.search_by_isbn(book_to_search.isbn)
                 logger.info(f"       Поиск книги по ISBN '{book_to_search.isbn}': найдено {len(found_books)} книг")
                 for book in found_books:
@@ -159,3 +266,40 @@ def run_simulation(steps: int = 20, seed: int | None = None) -> None:
             logger.info(f"       Поиск книги с несуществующим ISBN '{unreal_isbn}': найдено {len(found_books)} книг")
             if len(found_books) == 0:
                 logger.info(f"       Книга с таким isbn {unreal_isbn} не найдена ")
+
+        elif type_of_event == "Выдать книгу":
+            if len(library.books) > 0:
+                book_to_lend = library.sample()[0]
+                patron = random.choice(PATRONS)
+                loan = loans.checkout(book_to_lend.isbn, patron, clock.now)
+                if loan is not None:
+                    logger.info(f"       Выдана книга {book_to_lend} читателю {patron} до {loan.due} дня")
+                else:
+                    place = loans.place_hold(book_to_lend.isbn, patron)
+                    if place:
+                        logger.info(f"       Книга {book_to_lend} занята, {patron} в очереди под номером {place}")
+                    else:
+                        logger.info(f"       Книга {book_to_lend} уже у читателя {patron}")
+            else:
+                logger.info("       Нет книг для выдачи")
+
+        elif type_of_event == "Вернуть книгу":
+            loan = loans.sample_loan()
+            if loan is not None:
+                next_loan = loans.return_book(loan.isbn, clock.now)
+                logger.info(f"       Возвращена книга {loan.isbn} от читателя {loan.patron}")
+                if next_loan is not None:
+                    logger.info(f"       Книга {loan.isbn} выдана по брони читателю {next_loan.patron}")
+            else:
+                logger.info("       Нет выданных книг")
+
+        if checkpoint_every is not None and step % checkpoint_every == 0:
+            path = checkpoint_path(checkpoint_dir, step)
+            save_checkpoint(path, step, {
+                'library': library,
+                'loans': loans,
+                'clock': clock,
+                'weights': weights,
+                'random': random.getstate(),
+            })
+            logger.info(f"       Сохранена контрольная точка: {path}")
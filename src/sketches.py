@@ -0,0 +1,308 @@
+import math
+import random
+from array import array
+from typing import Any, Dict, List, Tuple
+from src.books import Book
+from src.hashing import hash64
+
+
+class HyperLogLog:
+    """
+    Приблизительный подсчет различных значений (HyperLogLog)
+
+    Память - 2 ** precision байт при любом числе значений, ошибка около 1.04 / sqrt(2 ** precision).
+    Два скетча с одинаковой точностью объединяются поэлементным максимумом
+    """
+
+    def __init__(self, precision: int = 12) -> None:
+        """
+        :param precision: число бит на номер регистра (от 4 до 16)
+        """
+        if not 4 <= precision <= 16:
+            raise ValueError("Точность HyperLogLog должна быть от 4 до 16")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: Any) -> None:
+        """Учитывает значение"""
+        h = hash64(value)
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        """
+        :return: оценка количества различных значений
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        # Для малых количеств точнее линейный подсчет по пустым регистрам
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+    def merge(self, other: 'HyperLogLog') -> None:
+        """Добавляет к скетчу значения другого скетча"""
+        if other.precision != self.precision:
+            raise ValueError("Объединять можно только скетчи с одинаковой точностью")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+
+class CountMinSketch:
+    """
+    Приблизительные частоты значений (Count-Min Sketch)
+
+    Оценка никогда не меньше настоящей частоты и превышает ее не больше чем на
+    e / width * (сумма всех частот) с вероятностью 1 - exp(-depth).
+    Частоты можно уменьшать (удаление книг), скетчи объединяются сложением
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4) -> None:
+        """
+        :param width: количество счетчиков в строке
+        :param depth: количество строк (независимых хеш-функций)
+        """
+        if width <= 0 or depth <= 0:
+            raise ValueError("Размеры Count-Min Sketch должны быть положительными")
+        self.width = width
+        self.depth = depth
+        self.table = [array('q', bytes(8 * width)) for _ in range(depth)]
+
+    def add(self, value: Any, count: int = 1) -> int:
+        """
+        Увеличивает частоту значения
+        :param value: значение
+        :param count: на сколько (отрицательное - уменьшить)
+        :return: новая оценка частоты (как estimate, но без повторного хеширования)
+        """
+        cells = [hash64(value, row) % self.width for row in range(self.depth)]
+        for row, i in zip(self.table, cells):
+            row[i] += count
+        return min(row[i] for row, i in zip(self.table, cells))
+
+    def estimate(self, value: Any) -> int:
+        """
+        :return: оценка частоты значения
+        """
+        return min(self.table[row][hash64(value, row) % self.width] for row in range(self.depth))
+
+    def merge(self, other: 'CountMinSketch') -> None:
+        """Добавляет к скетчу частоты другого скетча"""
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Объединять можно только скетчи одинакового размера")
+        for row, other_row in zip(self.table, other.table):
+            for i, count in enumerate(other_row):
+                if count:
+                    row[i] += count
+
+
+class HeavyHitters:
+    """
+    Самые частые значения: Count-Min Sketch плюс список из k кандидатов с наибольшей оценкой
+    """
+
+    def __init__(self, k: int = 10, width: int = 2048, depth: int = 4) -> None:
+        """
+        :param k: сколько самых частых значений хранить
+        :param width: ширина Count-Min Sketch
+        :param depth: глубина Count-Min Sketch
+        """
+        self.k = k
+        self.sketch = CountMinSketch(width, depth)
+        self.candidates: Dict[Any, int] = {}
+
+    def add(self, value: Any, count: int = 1) -> None:
+        """
+        Учитывает значение (за O(depth + k), k - небольшая константа)
+        :param value: значение
+        :param count: на сколько изменить частоту
+        :return: None
+        """
+        estimate = self.sketch.add(value, count)
+        if value in self.candidates:
+            if estimate > 0:
+                self.candidates[value] = estimate
+            else:
+                del self.candidates[value]
+        elif estimate > 0:
+            self._offer(value, estimate)
+
+    def _offer(self, value: Any, estimate: int) -> None:
+        """Добавляет кандидата, вытесняя самого редкого, если список полон"""
+        if len(self.candidates) < self.k:
+            self.candidates[value] = estimate
+            return
+        weakest = min(self.candidates, key=lambda candidate: self.candidates[candidate])
+        if estimate > self.candidates[weakest]:
+            del self.candidates[weakest]
+            self.candidates[value] = estimate
+
+    def top(self, n: int | None = None) -> List[Tuple[Any, int]]:
+        """
+        :param n: сколько значений вернуть (по умолчанию k)
+        :return: пары (значение, оценка частоты) по убыванию частоты
+        """
+        ranked = sorted(self.candidates.items(), key=lambda item: (-item[1], str(item[0])))
+        return ranked[:self.k if n is None else n]
+
+    def merge(self, other: 'HeavyHitters') -> None:
+        """Добавляет к скетчу значения другого скетча и заново выбирает кандидатов"""
+        self.sketch.merge(other.sketch)
+        values = set(self.candidates) | set(other.candidates)
+        self.candidates = {}
+        for value in values:
+            estimate = self.sketch.estimate(value)
+            if estimate > 0:
+                self._offer(value, estimate)
+
+
+class QuantileSketch:
+    """
+    Приблизительные квантили (упрощенный KLL)
+
+    Значения копятся в уровнях-компакторах. Когда уровень переполняется, он сортируется,
+    и каждый второй элемент переходит на следующий уровень с удвоенным весом.
+    Память - O(k * log(n / k)), скетчи объединяются слиянием уровней
+    """
+
+    def __init__(self, k: int = 200, seed: int = 0) -> None:
+        """
+        :param k: размер уровня (больше - точнее)
+        :param seed: seed для выбора половины при сжатии (для воспроизводимости)
+        """
+        if k < 2:
+            raise ValueError("Размер уровня должен быть не меньше 2")
+        self.k = k
+        self.levels: List[List[float]] = [[]]
+        self.count = 0
+        self._rng = random.Random(seed)
+
+    def add(self, value: float) -> None:
+        """Учитывает значение"""
+        self.levels[0].append(value)
+        self.count += 1
+        if len(self.levels[0]) >= self.k:
+            self._compress()
+
+    def _compress(self) -> None:
+        """Сжимает все переполненные уровни"""
+        for height in range(len(self.levels)):
+            if len(self.levels[height]) < self.k:
+                continue
+            if height + 1 == len(self.levels):
+                self.levels.append([])
+            level = sorted(self.levels[height])
+            # При нечетной длине последний элемент остается на уровне, чтобы вес сохранялся
+            leftover = [level.pop()] if len(level) % 2 else []
+            offset = self._rng.randrange(2)
+            self.levels[height + 1].extend(level[offset::2])
+            self.levels[height] = leftover
+
+    def quantile(self, q: float) -> float | None:
+        """
+        :param q: уровень квантиля от 0 до 1 (0.5 - медиана)
+        :return: оценка квантиля или None, если значений нет
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("Уровень квантиля должен быть от 0 до 1")
+        weighted = sorted((value, 1 << height) for height, level in enumerate(self.levels) for value in level)
+        if not weighted:
+            return None
+        total = sum(weight for _, weight in weighted)
+        target = q * total
+        cumulative = 0
+        for value, weight in weighted:
+            cumulative += weight
+            if cumulative >= target:
+                return value
+        return weighted[-1][0]
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """Добавляет к скетчу значения другого скетча"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for height, level in enumerate(other.levels):
+            self.levels[height].extend(level)
+        self.count += other.count
+        self._compress()
+
+
+class StatisticsSketch:
+    """
+    Приблизительная статистика каталога, обновляемая за O(1) на каждую книгу
+
+    Подписывается на библиотеку как слушатель. Количество книг, частоты авторов и жанров
+    учитывают и удаления. HyperLogLog и квантили удалений не поддерживают, поэтому
+    считают все книги, которые когда-либо были в каталоге.
+    Статистики разных шардов объединяются через merge
+    """
+
+    def __init__(self, top_k: int = 10, precision: int = 12) -> None:
+        """
+        :param top_k: сколько самых частых авторов и жанров помнить
+        :param precision: точность HyperLogLog
+        """
+        self.total_books = 0
+        self.authors = HyperLogLog(precision)
+        self.isbns = HyperLogLog(precision)
+        self.top_authors = HeavyHitters(top_k)
+        self.top_genres = HeavyHitters(top_k)
+        self.years = QuantileSketch()
+        # Квантили 0 и 1 у KLL могут промахнуться мимо крайних значений, поэтому границы точные
+        self.min_year: int | None = None
+        self.max_year: int | None = None
+
+    def on_add(self, book: Book) -> None:
+        """Учитывает добавленную книгу"""
+        self.total_books += 1
+        self.authors.add(book.author)
+        self.isbns.add(book.isbn)
+        self.top_authors.add(book.author)
+        self.top_genres.add(book.genre)
+        self.years.add(book.year)
+        if self.min_year is None or book.year < self.min_year:
+            self.min_year = book.year
+        if self.max_year is None or book.year > self.max_year:
+            self.max_year = book.year
+
+    def on_remove(self, book: Book) -> None:
+        """Учитывает удаленную книгу"""
+        self.total_books -= 1
+        self.top_authors.add(book.author, -1)
+        self.top_genres.add(book.genre, -1)
+
+    def merge(self, other: 'StatisticsSketch') -> None:
+        """Добавляет статистику другого шарда"""
+        self.total_books += other.total_books
+        self.authors.merge(other.authors)
+        self.isbns.merge(other.isbns)
+        self.top_authors.merge(other.top_authors)
+        self.top_genres.merge(other.top_genres)
+        self.years.merge(other.years)
+        if other.min_year is not None and (self.min_year is None or other.min_year < self.min_year):
+            self.min_year = other.min_year
+        if other.max_year is not None and (self.max_year is None or other.max_year > self.max_year):
+            self.max_year = other.max_year
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Количество книг и частоты учитывают удаления, а unique_authors, unique_isbns и year_bounds
+        считаются по всем книгам, которые когда-либо добавлялись.
+        year_bounds - точные [самый ранний, самый поздний] год, а не список всех годов, как years_range
+        в точной статистике. top_authors и top_genres - только top_k самых частых значений
+        с оценками частот, а не все авторы, как books_per_author
+        :return: приблизительная статистика
+        """
+        return {
+            'total_books': self.total_books,
+            'unique_authors': self.authors.count(),
+            'unique_isbns': self.isbns.count(),
+            'year_bounds': [] if self.min_year is None else [self.min_year, self.max_year],
+            'year_quantiles': {q: self.years.quantile(q) for q in (0.25, 0.5, 0.75)},
+            'top_authors': dict(self.top_authors.top()),
+            'top_genres': dict(self.top_genres.top()),
+        }
@@ -0,0 +1,147 @@
+import bisect
+from typing import Any, Callable, Dict, Iterator, List, Set
+from src.books import Book
+from src.collection import BookCollection
+
+
+class LibrarySnapshot:
+    """
+    Неизменяемое представление библиотеки на момент создания снимка
+
+    Снимок не копирует данные. Он помнит номер версии библиотеки, а библиотека,
+    пока снимок открыт, складывает изменения в историю. При чтении снимок берет
+    текущее состояние и откатывает изменения, сделанные после его версии, поэтому
+    память растет только вместе с числом этих изменений, а писатели не ждут читателей
+    """
+
+    def __init__(self, library: Any, version: int) -> None:
+        """
+        :param library: библиотека, с которой снят снимок
+        :param version: версия библиотеки на момент снимка
+        """
+        self._library = library
+        self.version = version
+        # Последняя учтенная запись истории и накопленная разница с текущим состоянием
+        self._seen = version
+        self._touched: Set[str] = set()  # ISBN, которые менялись после снимка
+        self._removed: Dict[str, Book] = {}  # книги, которые были в снимке и потом удалены
+
+    def _delta(self) -> tuple[Set[str], Dict[str, Book]]:
+        """
+        Досчитывает разницу по новым записям истории
+        :return: множество измененных ISBN и книги, которые были в снимке на момент его создания
+        """
+        if self._library is None:
+            raise ValueError("Снимок закрыт")
+
+        history = self._library._history
+        start = bisect.bisect_right(history, self._seen, key=lambda entry: entry[0])
+        for version, op, book in history[start:]:
+            # Состояние книги на момент снимка определяет первое изменение после него
+            if book.isbn not in self._touched:
+                self._touched.add(book.isbn)
+                if op == 'remove':
+                    self._removed[book.isbn] = book
+            self._seen = version
+        return self._touched, self._removed
+
+    def _adjust(self, current: BookCollection, predicate: Callable[[Book], bool]) -> BookCollection:
+        """
+        Превращает результат запроса к текущей библиотеке в результат на момент снимка
+        :param current: результат запроса к библиотеке сейчас
+        :param predicate: условие запроса (для книг, удаленных после снимка)
+        :return: коллекция книг на момент снимка
+        """
+        # Текущий результат берется до разницы: изменение, попавшее между ними,
+        # уже записано в истории и будет корректно откатано
+        touched, removed = self._delta()
+        res: List[Book] = [book for book in current if book.isbn not in touched]
+        res.extend(book for book in removed.values() if predicate(book))
+        return BookCollection(res)
+
+    def get_all_books(self) -> BookCollection:
+        """
+        :return: все книги на момент снимка
+        """
+        return self._adjust(BookCollection(list(self._library.books)), lambda book: True)
+
+    def search_by_isbn(self, isbn: str) -> BookCollection:
+        """
+        Поиск книги по isbn на момент снимка
+        :param isbn: isbn книги
+        :return: коллекция найденных книг
+        """
+        return self._adjust(self._library.search_by_isbn(isbn), lambda book: book.isbn == isbn)
+
+    def search_by_author(self, author: str) -> BookCollection:
+        """
+        Поиск книг по автору на момент снимка
+        :param author: автор, чьи книги нужно найти
+        :return: коллекция найденных книг
+        """
+        return self._adjust(self._library.search_by_author(author), lambda book: book.author == author)
+
+    def search_by_year(self, year: int) -> BookCollection:
+        """
+        Поиск книг по году издания на момент снимка
+        :param year: год издания
+        :return: коллекция найденных книг
+        """
+        return self._adjust(self._library.search_by_year(year), lambda book: book.year == year)
+
+    def search_by_genre(self, genre: str) -> BookCollection:
+        """
+        Поиск книг по жанру на момент снимка
+        :param genre: жанр
+        :return: коллекция найденных книг
+        """
+        return self._adjust(self._library.search_by_genre(genre),
+                            lambda book: book.genre.lower() == genre.lower())
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Статистика библиотеки на момент снимка
+        :return: Словарь со статистикой (в том же формате, что у Library)
+        """
+        books_per_author: Dict[str, int] = {}
+        years = set()
+        for book in self.get_all_books():
+            books_per_author[book.author] = books_per_author.get(book.author, 0) + 1
+            years.add(book.year)
+
+        return {
+            'total_books': sum(books_per_author.values()),
+            'unique_authors': len(books_per_author),
+            'years_range': sorted(years),
+            'books_per_author': books_per_author
+        }
+
+    def __len__(self) -> int:
+        """
+        :return: количество книг на момент снимка (за время, пропорциональное числу изменений)
+        """
+        positions = self._library.positions
+        size = len(positions)
+        touched, removed = self._delta()
+        return size - sum(1 for isbn in touched if isbn in positions) + len(removed)
+
+    def __iter__(self) -> Iterator[Book]:
+        """
+        :return: итератор по книгам на момент снимка
+        """
+        return iter(self.get_all_books())
+
+    def close(self) -> None:
+        """
+        Закрывает снимок: библиотека перестает хранить историю для него
+        :return: None
+        """
+        if self._library is not None:
+            self._library._snapshots.discard(self)
+            self._library = None
+
+    def __enter__(self) -> 'LibrarySnapshot':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+from src.books import Book
+from src.library import Library
+from src.catalog_io import import_catalog, export_catalog, read_csv
+
+
+class TestCatalogIO(unittest.TestCase):
+    """Тесты для импорта и экспорта каталога"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.library = Library()
+        self.library.add_books([
+            Book("Метро 2033", "Дмитрий Глуховский", 2005, "Фантастика", "9780543210987"),
+            Book("Граф Монте-Кристо", "Александр Дюма", 1844, "Приключения", "978012345710"),
+            Book("Кавычки \"и\", запятые", "Автор", 2000, "Роман", "1"),
+        ])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def check_round_trip(self, name):
+        path = os.path.join(self.tmp.name, name)
+        self.assertEqual(export_catalog(self.library, path), 3)
+
+        restored = Library()
+        self.assertEqual(import_catalog(restored, path, chunk_size=2), 3)
+
+        for book in self.library.books:
+            found = restored.search_by_isbn(book.isbn)[0]
+            self.assertEqual(found.to_dict(), book.to_dict())
+
+    def test_csv_round_trip(self):
+        """Тест что CSV сохраняет кириллицу, кавычки и запятые"""
+        self.check_round_trip('catalog.csv')
+
+    def test_jsonl_round_trip(self):
+        """Тест что JSONL сохраняет все поля"""
+        self.check_round_trip('catalog.jsonl')
+
+    def test_read_in_chunks(self):
+        """Тест чтения пачками фиксированного размера"""
+        path = os.path.join(self.tmp.name, 'catalog.csv')
+        export_catalog(self.library, path)
+
+        sizes = [len(chunk) for chunk in read_csv(path, chunk_size=2)]
+
+        self.assertEqual(sizes, [2, 1])
+
+    def test_unknown_format(self):
+        """Тест ошибки для неизвестного расширения"""
+        with self.assertRaises(ValueError):
+            export_catalog(self.library, os.path.join(self.tmp.name, 'catalog.xml'))
@@ -0,0 +1,95 @@
+import unittest
+from src.books import Book
+from src.library import Library
+from src.changelog import ChangeLog, ChangeLagError, Replica, decode_batch, encode_batch
+
+
+def isbns(library):
+    return sorted(book.isbn for book in library.books)
+
+
+class TestChangeLog(unittest.TestCase):
+    """Тесты для журнала изменений и реплики"""
+
+    def setUp(self):
+        self.primary = Library()
+        self.changelog = ChangeLog(self.primary, capacity=5)
+        self.replica = Replica()
+
+    def test_encoding(self):
+        """Тест что пачка декодируется в те же события"""
+        book = Book("Война и мир", "Толстой", 1869, "Роман", "1")
+        batch = encode_batch([(7, 'add', book), (8, 'remove', book)])
+        changes = decode_batch(batch)
+
+        self.assertEqual([(number, op) for number, op, _ in changes], [(7, 'add'), (8, 'remove')])
+        self.assertEqual(changes[0][2].to_dict(), book.to_dict())
+        self.assertEqual(changes[1][2].isbn, "1")
+        self.assertEqual(decode_batch(encode_batch([])), [])
+
+    def test_incremental_sync(self):
+        """Тест что реплика догоняет основную библиотеку по журналу"""
+        self.primary.add_books([Book(f"Книга {i}", "Автор", 2000 + i, "Роман", str(i)) for i in range(3)])
+        self.primary.remove_by_isbn("1")
+        # Журнал подключен к пустой библиотеке, поэтому первая синхронизация идет по журналу:
+        # применяются 4 события, а полная копия вернула бы 2 книги
+        self.assertEqual(self.replica.sync(self.primary, self.changelog), 4)
+        self.assertEqual(isbns(self.replica.library), ["0", "2"])
+
+        self.primary.remove_by_isbn("2")
+        self.primary.add_book(Book("Книга 3", "Автор", 2003, "Роман", "3"))
+        self.assertEqual(self.replica.sync(self.primary, self.changelog, batch_size=1), 2)
+        self.assertEqual(isbns(self.replica.library), isbns(self.primary))
+        self.assertEqual(self.replica.library.get_statistics(), self.primary.get_statistics())
+        self.assertEqual(self.replica.sync(self.primary, self.changelog), 0)
+
+    def test_lag_falls_back_to_copy(self):
+        """Тест что сильно отставшая реплика копирует библиотеку целиком"""
+        self.primary.add_book(Book("Книга", "Автор", 2000, "Роман", "0"))
+        self.replica.sync(self.primary, self.changelog)
+        for i in range(1, 10):
+            self.primary.add_book(Book(f"Книга {i}", "Автор", 2000, "Роман", str(i)))
+
+        with self.assertRaises(ChangeLagError):
+            self.changelog.changes_since(self.replica.sequence)
+        self.assertEqual(self.replica.sync(self.primary, self.changelog), 10)
+        self.assertEqual(isbns(self.replica.library), isbns(self.primary))
+        self.assertEqual(self.replica.sequence, self.changelog.sequence)
+
+    def test_log_attached_late(self):
+        """Тест что журнал, подключенный к непустой библиотеке, не теряет старые книги"""
+        primary = Library()
+        primary.add_books([Book(f"Книга {i}", "Автор", 2000, "Роман", str(i)) for i in range(3)])
+        changelog = ChangeLog(primary)
+        primary.add_book(Book("Книга 3", "Автор", 2000, "Роман", "3"))
+
+        self.assertEqual(changelog.sequence, primary.version)
+        with self.assertRaises(ChangeLagError):
+            changelog.changes_since(0)
+        self.assertEqual(self.replica.sync(primary, changelog), 4)
+        self.assertEqual(isbns(self.replica.library), ["0", "1", "2", "3"])
+
+        # Журнал без библиотеки подписан вручную уже после добавления книг
+        manual = ChangeLog()
+        primary.add_listener(manual)
+        primary.add_book(Book("Книга 4", "Автор", 2000, "Роман", "4"))
+        replica = Replica()
+        self.assertEqual(replica.sync(primary, manual), 5)
+        self.assertEqual(isbns(replica.library), isbns(primary))
+
+    def test_batch_size(self):
+        """Тест что пачки ограничены batch_size и берутся с конца журнала"""
+        self.primary.add_books([Book(f"Книга {i}", "Автор", 2000, "Роман", str(i)) for i in range(4)])
+        numbers = [number for number, _, _ in decode_batch(self.changelog.changes_since(1, limit=2))]
+
+        self.assertEqual(numbers, [2, 3])
+        self.assertEqual(decode_batch(self.changelog.changes_since(4)), [])
+        with self.assertRaises(ValueError):
+            self.replica.sync(self.primary, self.changelog, batch_size=0)
+
+    def test_gap_rejected(self):
+        """Тест что пачка с пропуском событий не применяется"""
+        self.primary.add_book(Book("Книга", "Автор", 2000, "Роман", "0"))
+        self.primary.add_book(Book("Книга", "Автор", 2000, "Роман", "1"))
+        with self.assertRaises(ValueError):
+            self.replica.apply(self.changelog.changes_since(1))
@@ -0,0 +1,81 @@
+import os
+import pickle
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.books import Book
+from src.changelog import ChangeLog
+from src.checkpoint import checkpoint_path, load_checkpoint, save_checkpoint
+from src.library import Library
+from src.simulation import run_simulation
+
+
+class TestCheckpoint(unittest.TestCase):
+    """Тесты для контрольных точек симуляции"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "state.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_save_and_load(self):
+        """Тест что контрольная точка читается в то же состояние"""
+        save_checkpoint(self.path, 7, {'numbers': [1, 2, 3]})
+        state = load_checkpoint(self.path)
+
+        self.assertEqual(state, {'numbers': [1, 2, 3], 'step': 7})
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+
+    def test_corrupted(self):
+        """Тест что поврежденная контрольная точка не читается"""
+        save_checkpoint(self.path, 1, {'numbers': list(range(100))})
+        with open(self.path, 'r+b') as file:
+            file.seek(-1, os.SEEK_END)
+            file.write(b'\x00')
+
+        with self.assertRaises(ValueError):
+            load_checkpoint(self.path)
+
+    def test_library_pickle(self):
+        """Тест что библиотека сохраняется без снимков и внешних подписчиков"""
+        library = Library(cache_size=8)
+        library.add_book(Book("Война и мир", "Толстой", 1869, "Роман", "1"))
+        library.search_by_author("Толстой")
+        library.add_listener(ChangeLog())
+        snapshot = library.snapshot()
+        library.add_book(Book("Анна Каренина", "Толстой", 1877, "Роман", "2"))
+
+        copy = pickle.loads(pickle.dumps(library))
+        snapshot.close()
+
+        self.assertEqual(copy.listeners, [])
+        self.assertEqual(len(copy.search_by_author("Толстой")), 2)
+        copy.add_book(Book("Детство", "Толстой", 1852, "Повесть", "3"))
+        self.assertEqual(len(copy.search_by_author("Толстой")), 3)
+        self.assertEqual(len(library.search_by_author("Толстой")), 2)
+
+    def test_resume_matches_full_run(self):
+        """Тест что симуляция с контрольной точки совпадает с полным запуском"""
+        directory = self.directory.name
+        with patch('src.simulation.logger') as mock_logger:
+            run_simulation(steps=120, seed=11, catalog_size=50, checkpoint_every=40, checkpoint_dir=directory)
+            full = [call.args[0] for call in mock_logger.info.call_args_list]
+            mock_logger.reset_mock()
+
+            run_simulation(steps=120, resume_from=checkpoint_path(directory, 40),
+                           checkpoint_every=40, checkpoint_dir=directory)
+            resumed = [call.args[0] for call in mock_logger.info.call_args_list]
+
+        saved = full.index(f"       Сохранена контрольная точка: {checkpoint_path(directory, 40)}")
+        self.assertEqual(resumed[0], "Продолжение симуляции с шага 41 ( всего 120 шагов ) ")
+        self.assertEqual(resumed[1:], full[saved + 1:])
+
+    def test_missing_directory_created(self):
+        """Тест что каталог для контрольных точек создается, если его еще нет"""
+        directory = os.path.join(self.directory.name, "ckpt", "run")
+        with patch('src.simulation.logger'):
+            run_simulation(steps=20, seed=1, checkpoint_every=10, checkpoint_dir=directory)
+
+        self.assertEqual(load_checkpoint(checkpoint_path(directory, 20))['step'], 20)
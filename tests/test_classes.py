@@ -1,8 +1,15 @@
+import copy
+import io
+import random
 import unittest
+from unittest.mock import patch
 from src.books import Book
 from src.collection import BookCollection
-from src.indexes import ISBNIndexDict, AuthorIndexDict, YearIndexDict
+from src.indexes import IndexDict, ISBNIndexDict, AuthorIndexDict, YearIndexDict, REPORT_LIMIT
 from src.library import Library
+from src.cache import QueryCache
+from src.bloom import CountingBloomFilter
+from src.columnar import ColumnarCatalog, np
 
 
 class TestBook(unittest.TestCase):
@@ -105,6 +112,51 @@ class TestBookCollection(unittest.TestCase):
         self.assertTrue(book1 in collection)
         self.assertFalse(book2 in collection)
 
+    def test_union_keeps_order(self):
+        """Тест что объединение сохраняет порядок и убирает дубликаты"""
+        book1 = Book("Книга 1", "Автор 1", 2008, "Жанр", "1")
+        book2 = Book("Книга 2", "Автор 2", 2007, "Жанр", "2")
+        book3 = Book("Книга 3", "Автор 3", 2006, "Жанр", "3")
+        left = BookCollection([book2, book1])
+        right = BookCollection([book1, book3])
+
+        self.assertEqual(list(left | right), [book2, book1, book3])
+        self.assertEqual(list(left + right), [book2, book1, book3])
+
+    def test_intersection_and_difference(self):
+        """Тест пересечения и разности коллекций"""
+        book1 = Book("Книга 1", "Автор 1", 2008, "Жанр", "1")
+        book2 = Book("Книга 2", "Автор 2", 2007, "Жанр", "2")
+        book3 = Book("Книга 3", "Автор 3", 2006, "Жанр", "3")
+        left = BookCollection([book3, book1, book2])
+        right = BookCollection([book2, book3])
+
+        self.assertEqual(list(left & right), [book3, book2])
+        self.assertEqual(list(left - right), [book1])
+
+    def test_in_place_operators(self):
+        """Тест операторов |=, &= и -="""
+        book1 = Book("Книга 1", "Автор 1", 2008, "Жанр", "1")
+        book2 = Book("Книга 2", "Автор 2", 2007, "Жанр", "2")
+        collection = BookCollection([book1])
+
+        collection |= BookCollection([book2])
+        self.assertEqual(list(collection), [book1, book2])
+        collection -= BookCollection([book1])
+        self.assertEqual(list(collection), [book2])
+        collection &= BookCollection([book1])
+        self.assertEqual(len(collection), 0)
+
+    def test_merge_sorted(self):
+        """Тест слияния коллекций, отсортированных по ISBN"""
+        books = [Book(f"Книга {i}", "Автор", 2000, "Жанр", str(i)) for i in range(1, 6)]
+        left = BookCollection([books[0], books[1], books[3]])
+        right = BookCollection([books[1], books[2], books[4]])
+
+        self.assertEqual(list(left.merge_sorted(right)), books)
+        self.assertEqual(list(left.merge_sorted(right, op='intersection')), [books[1]])
+        self.assertEqual(list(left.merge_sorted(right, op='difference')), [books[0], books[3]])
+
 
 class TestISBNIndexDict(unittest.TestCase):
     """Тесты для класса ISBNIndexDict"""
@@ -356,3 +408,496 @@ class TestLibrary(unittest.TestCase):
         self.assertEqual(stats['unique_authors'], 2)
         self.assertIn(1900, stats['years_range'])
         self.assertIn(2008, stats['years_range'])
+
+    def test_add_duplicate_isbn(self):
+        """Тест что книга с уже существующим ISBN не добавляется второй раз"""
+        library = Library()
+        library.add_book(Book("Книга 1", "Автор", 2008, "Жанр", "1"))
+        library.add_book(Book("Книга 2", "Автор", 2008, "Жанр", "1"))
+
+        self.assertEqual(len(library.get_all_books()), 1)
+
+    def test_remove_by_isbn(self):
+        """Тест удаления книги по ISBN"""
+        library = Library()
+        books = [Book(f"Книга {i}", "Автор", 2000 + i % 2, "Жанр", str(i)) for i in range(5)]
+        for book in books:
+            library.add_book(book)
+
+        self.assertTrue(library.remove_by_isbn("1"))
+        self.assertFalse(library.remove_by_isbn("1"))
+        self.assertTrue(library.remove_by_isbn("4"))
+
+        self.assertEqual(len(library.get_all_books()), 3)
+        self.assertEqual(len(library.search_by_isbn("1")), 0)
+        self.assertEqual(len(library.search_by_author("Автор")), 3)
+        self.assertEqual(len(library.search_by_year(2001)), 1)
+        # Оставшиеся книги по-прежнему удаляются, значит позиции не сбились
+        for isbn in ("0", "2", "3"):
+            self.assertTrue(library.remove_by_isbn(isbn))
+        self.assertEqual(len(library.get_all_books()), 0)
+
+    def test_remove_where(self):
+        """Тест массового удаления по условию"""
+        library = Library()
+        for i in range(6):
+            library.add_book(Book(f"Книга {i}", f"Автор {i % 2}", 2000 + i, "Жанр", str(i)))
+
+        removed = library.remove_where(lambda book: book.year < 2003)
+
+        self.assertEqual(removed, 3)
+        self.assertEqual([book.isbn for book in library.get_all_books()], ["3", "4", "5"])
+        self.assertEqual(len(library.search_by_author("Автор 0")), 1)
+        self.assertEqual(len(library.search_by_year(2001)), 0)
+        self.assertNotIn(2001, library.indexes['year'].index)
+        self.assertTrue(library.remove_book(Book("Книга 5", "Автор 1", 2005, "Жанр", "5")))
+
+    def test_remove_many(self):
+        """Тест массового удаления по списку ISBN"""
+        library = Library()
+        for i in range(4):
+            library.add_book(Book(f"Книга {i}", "Автор", 2000, "Жанр", str(i)))
+
+        self.assertEqual(library.remove_many(["0", "2", "нет такого"]), 2)
+        self.assertEqual(len(library.search_by_author("Автор")), 2)
+        self.assertEqual(len(library.search_by_isbn("2")), 0)
+
+    def test_sample(self):
+        """Тест случайной выборки книг"""
+        library = Library()
+        for i in range(10):
+            library.add_book(Book(f"Книга {i}", "Автор", 2000, "Жанр", str(i)))
+        library.remove_by_isbn("3")
+
+        sample = library.sample(k=4, rng=random.Random(1))
+        same = library.sample(k=4, rng=random.Random(1))
+
+        self.assertEqual(len(sample), 4)
+        self.assertEqual(len({book.isbn for book in sample}), 4)
+        self.assertEqual(list(sample), list(same))
+        self.assertNotIn("3", [book.isbn for book in library.sample(k=9)])
+        with self.assertRaises(ValueError):
+            library.sample(k=10)
+        with self.assertRaises(ValueError):
+            Library().sample()
+
+
+class TestQueryCache(unittest.TestCase):
+    """Тесты для кэша результатов поиска"""
+
+    def test_hit_after_miss(self):
+        """Тест что повторный запрос берется из кэша"""
+        library = Library(cache_size=8)
+        library.add_book(Book("Книга", "Автор", 2008, "Жанр", "1"))
+
+        library.search_by_author("Автор")
+        found = library.search_by_author("Автор")
+
+        self.assertEqual(len(found), 1)
+        self.assertEqual(library.cache_stats()['hits'], 1)
+        self.assertEqual(library.cache_stats()['misses'], 1)
+
+    def test_invalidate_only_touched_keys(self):
+        """Тест что изменение книги инвалидирует только ее автора, год и жанр"""
+        library = Library(cache_size=8)
+        library.add_book(Book("Книга 1", "Автор 1", 2008, "Роман", "1"))
+        library.add_book(Book("Книга 2", "Автор 2", 1990, "Драма", "2"))
+        library.search_by_author("Автор 1")
+        library.search_by_author("Автор 2")
+
+        library.add_book(Book("Книга 3", "Автор 1", 2008, "Роман", "3"))
+
+        self.assertEqual(len(library.search_by_author("Автор 1")), 2)
+        self.assertEqual(len(library.search_by_author("Автор 2")), 1)
+        self.assertEqual(library.cache_stats()['hits'], 1)
+
+    def test_remove_invalidates_genre(self):
+        """Тест что удаление книги сбрасывает результат поиска по жанру"""
+        library = Library(cache_size=8)
+        book = Book("Книга", "Автор", 2008, "Роман", "1")
+        library.add_book(book)
+        self.assertEqual(len(library.search_by_genre("роман")), 1)
+
+        library.remove_book(book)
+
+        self.assertEqual(len(library.search_by_genre("Роман")), 0)
+
+    def test_lru_eviction(self):
+        """Тест вытеснения самой давно использованной записи"""
+        cache = QueryCache(max_size=2)
+        cache.put('year', 1, BookCollection())
+        cache.put('year', 2, BookCollection())
+        cache.get('year', 1)
+        cache.put('year', 3, BookCollection())
+
+        self.assertIsNotNone(cache.get('year', 1))
+        self.assertIsNone(cache.get('year', 2))
+
+    def test_results_are_copies(self):
+        """Тест что изменение найденной коллекции не меняет кэш и библиотеку"""
+        library = Library(cache_size=8)
+        library.add_book(Book("Книга", "Автор", 2008, "Роман", "1"))
+        first = library.search_by_author("Автор")
+        first.remove(first[0])
+
+        hit = library.search_by_author("Автор")
+        self.assertEqual(len(hit), 1)
+        self.assertIsNot(hit[0], library.books[0])
+        self.assertEqual(library.cache_stats()['hits'], 1)
+
+    def test_changed_result_does_not_change_hit(self):
+        """Тест что изменение книги из результата не меняет следующие попадания"""
+        library = Library(cache_size=8)
+        library.add_book(Book("Книга", "Автор", 2008, "Роман", "1"))
+        library.search_by_author("Автор")[0].title = "Измененная"
+        library.search_by_author("Автор")[0].title = "Еще раз"
+
+        hit = library.search_by_author("Автор")
+        self.assertEqual(hit[0].title, "Книга")
+        self.assertEqual(library.books[0].title, "Книга")
+        self.assertEqual(library.cache_stats()['hits'], 2)
+
+    def test_hit_skips_search(self):
+        """Тест что попадание в кэш не выполняет поиск заново"""
+        calls = []
+        library = Library(cache_size=8)
+        library.add_book(Book("Книга", "Автор", 2008, "Роман", "1"))
+
+        def compute():
+            calls.append(1)
+            return BookCollection([Book("Книга", "Автор", 2008, "Роман", "1")])
+
+        library._cached('author', "Автор", compute)
+        library._cached('author', "Автор", compute)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(library.cache_stats()['hits'], 1)
+        self.assertEqual(library.cache_stats()['misses'], 1)
+
+    def test_hit_cheaper_than_search(self):
+        """Тест что попадание в кэш не копирует книги через copy.deepcopy, в отличие от поиска"""
+        books = [Book(f"Книга {i}", "Автор", 2000, "Роман", str(i)) for i in range(100)]
+        cached, uncached = Library(cache_size=8), Library()
+        for book in books:
+            cached.add_book(book)
+            uncached.add_book(book)
+        cached.search_by_author("Автор")
+
+        with patch('copy.deepcopy', wraps=copy.deepcopy) as deepcopy:
+            hit = cached.search_by_author("Автор")
+            deepcopy.assert_not_called()
+            found = uncached.search_by_author("Автор")
+            deepcopy.assert_called()
+
+        self.assertEqual(repr(hit), repr(found))
+        self.assertEqual(cached.cache_stats()['hits'], 1)
+
+    def test_versions_bounded(self):
+        """Тест что счетчики версий не копятся для ключей без записей"""
+        cache = QueryCache(max_size=2)
+        for year in range(100):
+            cache.invalidate(Book("Книга", f"Автор {year}", year, "Роман", str(year)))
+            cache.put('year', year, BookCollection())
+
+        self.assertEqual(len(cache.entries), 2)
+        self.assertLessEqual(len(cache.versions), 2)
+
+
+class TestLibrarySnapshot(unittest.TestCase):
+    """Тесты для снимков библиотеки"""
+
+    def setUp(self):
+        self.library = Library()
+        self.book1 = Book("Книга 1", "Автор 1", 2008, "Роман", "1")
+        self.book2 = Book("Книга 2", "Автор 2", 1990, "Драма", "2")
+        self.library.add_book(self.book1)
+        self.library.add_book(self.book2)
+
+    def test_snapshot_does_not_see_changes(self):
+        """Тест что снимок не видит изменений, сделанных после него"""
+        snapshot = self.library.snapshot()
+
+        self.library.remove_book(self.book1)
+        self.library.add_book(Book("Книга 3", "Автор 1", 2008, "Роман", "3"))
+
+        self.assertEqual(len(snapshot), 2)
+        self.assertEqual({book.isbn for book in snapshot}, {"1", "2"})
+        self.assertEqual(len(snapshot.search_by_author("Автор 1")), 1)
+        self.assertEqual(len(snapshot.search_by_isbn("1")), 1)
+        self.assertEqual(len(snapshot.search_by_isbn("3")), 0)
+        self.assertEqual(len(snapshot.search_by_genre("роман")), 1)
+        self.assertEqual(snapshot.get_statistics()['total_books'], 2)
+        self.assertEqual(len(self.library.search_by_author("Автор 1")), 1)
+
+    def test_remove_and_add_again(self):
+        """Тест что книга, удаленная и добавленная заново, в снимке в старом виде"""
+        snapshot = self.library.snapshot()
+
+        self.library.remove_book(self.book2)
+        self.library.add_book(Book("Новая книга 2", "Автор 3", 2020, "Драма", "2"))
+
+        found = snapshot.search_by_isbn("2")
+        self.assertEqual(len(found), 1)
+        self.assertEqual(found[0].title, "Книга 2")
+        self.assertEqual(len(snapshot.search_by_year(2020)), 0)
+
+    def test_history_released_after_close(self):
+        """Тест что после закрытия всех снимков история изменений не копится"""
+        with self.library.snapshot():
+            self.library.add_book(Book("Книга 3", "Автор", 2000, "Жанр", "3"))
+            self.assertEqual(len(self.library._history), 1)
+
+        self.library.add_book(Book("Книга 4", "Автор", 2000, "Жанр", "4"))
+        self.assertEqual(len(self.library._history), 0)
+
+    def test_history_trimmed_to_oldest_snapshot(self):
+        """Тест что история хранится только с версии самого старого снимка"""
+        old = self.library.snapshot()
+        self.library.add_book(Book("Книга 3", "Автор", 2000, "Жанр", "3"))
+        new = self.library.snapshot()
+        old.close()
+        self.library.add_book(Book("Книга 4", "Автор", 2000, "Жанр", "4"))
+
+        self.assertEqual(len(self.library._history), 1)
+        self.assertEqual(len(new), 3)
+
+
+@unittest.skipIf(np is None, "numpy не установлен")
+class TestColumnarCatalog(unittest.TestCase):
+    """Тесты для колоночного зеркала каталога"""
+
+    def setUp(self):
+        self.library = Library(columnar=True)
+        self.library.add_books([
+            Book("Книга 1", "Автор 1", 1995, "Роман", "1"),
+            Book("Книга 2", "Автор 1", 2008, "Драма", "2"),
+            Book("Книга 3", "Автор 2", 2001, "Роман", "3"),
+            Book("Книга 4", "Автор 3", 2008, "Роман", "4"),
+        ])
+
+    def test_counts(self):
+        """Тест гистограмм по годам, десятилетиям, авторам и жанрам"""
+        columnar = self.library.columnar
+
+        self.assertEqual(columnar.year_histogram(), {1995: 1, 2001: 1, 2008: 2})
+        self.assertEqual(columnar.decade_counts(), {1990: 1, 2000: 3})
+        self.assertEqual(columnar.author_counts(), {"Автор 1": 2, "Автор 2": 1, "Автор 3": 1})
+        self.assertEqual(columnar.genre_counts(), {"Роман": 3, "Драма": 1})
+        self.assertEqual(columnar.count(year_from=2000, genre="Роман"), 2)
+        self.assertEqual(columnar.count(author="Нет такого"), 0)
+
+    def test_sync_with_remove(self):
+        """Тест что зеркало обновляется при удалении книг"""
+        self.library.remove_by_isbn("1")
+        self.library.remove_where(lambda book: book.author == "Автор 3")
+
+        self.assertEqual(len(self.library.columnar), 2)
+        self.assertEqual(self.library.columnar.author_counts(), {"Автор 1": 1, "Автор 2": 1})
+
+    def test_statistics_match_plain_library(self):
+        """Тест что статистика совпадает со статистикой без зеркала"""
+        plain = Library()
+        plain.add_books(self.library.get_all_books())
+
+        self.assertEqual(self.library.get_statistics(), plain.get_statistics())
+
+    def test_growth(self):
+        """Тест роста массивов"""
+        catalog = ColumnarCatalog(capacity=2)
+        for i in range(5):
+            catalog.on_add(Book("Книга", "Автор", 2000 + i, "Жанр", str(i)))
+
+        self.assertEqual(catalog.count(year_from=2003), 2)
+
+
+class TestIndexRegistry(unittest.TestCase):
+    """Тесты для объявления, ленивого построения и удаления индексов"""
+
+    def setUp(self):
+        self.books = [
+            Book("Война и мир", "Лев Николаевич Толстой", 1869, "Роман", "1"),
+            Book("Мир полудня", "Братья Стругацкие", 1962, "Фантастика", "2"),
+            Book("Анна Каренина", "Лев Николаевич Толстой", 1877, "Роман", "3"),
+        ]
+
+    def test_index_built_lazily(self):
+        """Тест что индекс строится только при первом запросе и дальше поддерживается"""
+        library = Library()
+        library.add_books(self.books)
+        self.assertNotIn('author', library.indexes)
+
+        self.assertEqual(len(library.search_by_author("Лев Николаевич Толстой")), 2)
+        self.assertIn('author', library.indexes)
+        self.assertNotIn('year', library.indexes)
+
+        library.add_book(Book("Детство", "Лев Николаевич Толстой", 1852, "Повесть", "4"))
+        self.assertEqual(len(library.search_by_author("Лев Николаевич Толстой")), 3)
+
+    def test_statistics_do_not_build_indexes(self):
+        """Тест что статистика не строит индексы"""
+        library = Library()
+        library.add_books(self.books)
+
+        self.assertEqual(library.get_statistics()['years_range'], [1869, 1877, 1962])
+        self.assertEqual(library.indexes, {})
+
+    def test_scan_returns_copies(self):
+        """Тест что поиск без индекса, как и через индекс, возвращает копии"""
+        library = Library(indexes={})
+        library.add_books(self.books)
+
+        library.search_by_author("Братья Стругацкие")[0].title = "Другое название"
+        library.search_by_isbn("1")[0].title = "Другое название"
+
+        self.assertEqual(self.books[1].title, "Мир полудня")
+        self.assertEqual(self.books[0].title, "Война и мир")
+
+    def test_base_index_is_abstract(self):
+        """Тест что базовый IndexDict нельзя создать без key_of"""
+        with self.assertRaises(TypeError):
+            IndexDict()
+
+    def test_drop_index(self):
+        """Тест что без индекса поиск работает перебором"""
+        library = Library()
+        library.add_books(self.books)
+        library.search_by_year(1869)
+
+        library.drop_index('year')
+
+        self.assertNotIn('year', library.indexes)
+        self.assertEqual(len(library.search_by_year(1869)), 1)
+        with self.assertRaises(KeyError):
+            library.drop_index('year')
+
+    def test_only_selected_indexes(self):
+        """Тест библиотеки с выбранным набором индексов"""
+        library = Library(indexes={'genre': 'hash'})
+        library.add_books(self.books)
+
+        self.assertEqual(len(library.search_by_genre("роман")), 2)
+        self.assertEqual(len(library.search_by_isbn("2")), 1)
+        self.assertEqual(len(library.search_by_author("Братья Стругацкие")), 1)
+        self.assertEqual(list(library.indexes), ['genre'])
+        self.assertEqual(library.get_statistics()['unique_authors'], 2)
+
+    def test_sorted_index_range(self):
+        """Тест поиска по диапазону через отсортированный индекс"""
+        library = Library()
+        library.create_index('year', kind='sorted')
+        library.add_books(self.books)
+
+        found = library.search_range('year', 1865, 1900)
+        self.assertEqual([book.isbn for book in found], ["1", "3"])
+
+        library.remove_by_isbn("1")
+        self.assertEqual([book.isbn for book in library.search_range('year', low=1865)], ["3", "2"])
+        self.assertEqual(library.indexes['year'].sorted_keys, [1877, 1962])
+
+    def test_text_index(self):
+        """Тест поиска по словам названия"""
+        library = Library()
+        library.create_index('title', kind='text')
+        library.add_books(self.books)
+
+        self.assertEqual([book.isbn for book in library.search_text('title', "мир")], ["1", "2"])
+        self.assertEqual([book.isbn for book in library.search_text('title', "Мир полудня")], ["2"])
+
+        library.remove_many(["2"])
+        self.assertEqual([book.isbn for book in library.search_text('title', "мир")], ["1"])
+
+    def test_invalid_index(self):
+        """Тест ошибок при объявлении индекса"""
+        library = Library()
+        with self.assertRaises(ValueError):
+            library.create_index('publisher')
+        with self.assertRaises(ValueError):
+            library.create_index('year', kind='btree')
+
+
+class TestBloomFilter(unittest.TestCase):
+    """Тесты для фильтра Блума перед индексом по ISBN"""
+
+    def test_no_false_negatives(self):
+        """Тест что добавленные ключи всегда "возможно есть", а удаленные пропадают"""
+        bloom = CountingBloomFilter(capacity=100, error_rate=0.01)
+        for i in range(100):
+            bloom.add(str(i))
+
+        self.assertTrue(all(str(i) in bloom for i in range(100)))
+        false_positives = sum(str(i) in bloom for i in range(1000, 2000))
+        self.assertLess(false_positives, 50)
+
+        for i in range(100):
+            bloom.remove(str(i))
+        self.assertFalse(any(str(i) in bloom for i in range(100)))
+
+    def test_isbn_index_with_filter(self):
+        """Тест что промахи по ISBN отсекаются фильтром и считаются"""
+        library = Library()
+        library.create_index('isbn', bloom_error_rate=0.01)
+        library.add_books(Book(f"Книга {i}", "Автор", 2000, "Жанр", str(i)) for i in range(10))
+        library.remove_by_isbn("3")
+
+        self.assertEqual(len(library.search_by_isbn("5")), 1)
+        self.assertEqual(len(library.search_by_isbn("3")), 0)
+        self.assertEqual(len(library.search_by_isbn("1234567891011")), 0)
+
+        stats = library.get_index('isbn').filter_stats()
+        self.assertEqual(stats['checks'], 3)
+        self.assertEqual(stats['negatives'] + stats['false_positives'], 2)
+        self.assertEqual(stats['keys'], 9)
+
+    def test_filter_grows(self):
+        """Тест что фильтр пересобирается при переполнении и не теряет ключи"""
+        index = ISBNIndexDict(bloom_error_rate=0.01, bloom_capacity=4)
+        for i in range(20):
+            index.add_book(Book("Книга", "Автор", 2000, "Жанр", str(i)))
+
+        self.assertGreaterEqual(index.bloom.capacity, 20)
+        self.assertTrue(all(len(index.get(str(i))) == 1 for i in range(20)))
+
+
+class TestReports(unittest.TestCase):
+    """Тесты для потоковых отчетов"""
+
+    def setUp(self):
+        self.library = Library()
+        self.library.add_books(Book(f"Книга {i}", f"Автор {i % 3}", 2000 + i % 5, "Жанр", str(i))
+                               for i in range(2 * REPORT_LIMIT))
+
+    def test_write_report_library(self):
+        """Тест что полный отчет пишется в поток построчно"""
+        stream = io.StringIO()
+
+        lines = self.library.write_report(stream)
+
+        self.assertEqual(lines, 2 * REPORT_LIMIT + 1)
+        report = stream.getvalue()
+        self.assertTrue(report.startswith(f"Всего книг в библиотеке {2 * REPORT_LIMIT}\n\n1. Книга 0"))
+        self.assertIn(f"{2 * REPORT_LIMIT}. Книга {2 * REPORT_LIMIT - 1}", report)
+
+    def test_write_report_indexes(self):
+        """Тест отчетов индексов"""
+        for field, books_lines in (('isbn', 2 * REPORT_LIMIT), ('author', 2 * REPORT_LIMIT + 3),
+                                   ('year', 2 * REPORT_LIMIT + 5)):
+            stream = io.StringIO()
+            self.assertEqual(self.library.get_index(field).write_report(stream), books_lines)
+            self.assertEqual(stream.getvalue(), ''.join(self.library.get_index(field).iter_report()))
+
+    def test_repr_truncated(self):
+        """Тест что __repr__ большой коллекции показывает только начало"""
+        text = repr(self.library)
+
+        self.assertEqual(len(text.splitlines()), REPORT_LIMIT + 2)
+        self.assertIn("write_report", text)
+        self.assertNotIn(f"{2 * REPORT_LIMIT}. Книга", text)
+        self.assertIn("write_report", repr(self.library.get_index('isbn')))
+
+    def test_repr_small(self):
+        """Тест что маленький отчет выводится целиком"""
+        index = AuthorIndexDict()
+        index.add_book(Book("Книга", "Автор", 2008, "Жанр", "1"))
+
+        self.assertEqual(repr(index), "Найдено 1 книг от автора Автор:\n\n1: Книга (Жанр, Автор, 2008)\n")
+        self.assertEqual(repr(YearIndexDict()), "Нет книг с таким годом издания")
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import time
+import unittest
+from src.books import Book
+from src.journal import Journal
+
+
+class TestJournal(unittest.TestCase):
+    """Тесты для журнала изменений библиотеки"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'library.journal')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_replay_after_restart(self):
+        """Тест что после перезапуска библиотека восстанавливается из журнала"""
+        with Journal(self.path, batch_size=2) as journal:
+            library = journal.restore()
+            book1 = Book("Метро 2033", "Дмитрий Глуховский", 2005, "Фантастика", "1")
+            book2 = Book("Оно", "Стивен Кинг", 1986, "Ужасы", "2")
+            library.add_book(book1)
+            library.add_book(book2)
+            library.remove_book(book1)
+
+        with Journal(self.path) as journal:
+            restored = journal.restore()
+
+        self.assertEqual(len(restored.get_all_books()), 1)
+        self.assertEqual(restored.search_by_isbn("2")[0].author, "Стивен Кинг")
+        self.assertEqual(len(restored.search_by_isbn("1")), 0)
+
+    def test_group_commit(self):
+        """Тест что записи сбрасываются на диск пачками"""
+        with Journal(self.path, batch_size=3, max_delay=None) as journal:
+            library = journal.restore()
+            library.add_book(Book("Книга 1", "Автор", 2008, "Жанр", "1"))
+            library.add_book(Book("Книга 2", "Автор", 2008, "Жанр", "2"))
+            self.assertEqual(os.path.getsize(self.path), 0)
+
+            library.add_book(Book("Книга 3", "Автор", 2008, "Жанр", "3"))
+            self.assertGreater(os.path.getsize(self.path), 0)
+            self.assertEqual(len(journal.pending), 0)
+
+    def test_partial_batch_committed_after_delay(self):
+        """Тест что неполная пачка коммитится по таймеру без новых изменений"""
+        with Journal(self.path, batch_size=100, max_delay=0.05) as journal:
+            library = journal.restore()
+            library.add_book(Book("Книга", "Автор", 2008, "Жанр", "1"))
+            deadline = time.monotonic() + 5
+            while journal.pending and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            self.assertEqual(len(journal.pending), 0)
+            self.assertGreater(os.path.getsize(self.path), 0)
+
+        with Journal(self.path) as journal:
+            self.assertEqual(len(journal.restore().get_all_books()), 1)
+
+    def test_compact(self):
+        """Тест что сжатие переносит состояние в снимок и очищает журнал"""
+        with Journal(self.path) as journal:
+            library = journal.restore()
+            library.add_book(Book("Книга 1", "Автор", 2008, "Жанр", "1"))
+            library.add_book(Book("Книга 2", "Автор", 2008, "Жанр", "2"))
+            journal.compact(library)
+            library.add_book(Book("Книга 3", "Автор", 2008, "Жанр", "3"))
+            self.assertEqual(os.path.getsize(self.path), 0)
+
+        with Journal(self.path) as journal:
+            restored = journal.restore()
+
+        self.assertEqual(len(restored.get_all_books()), 3)
+
+    def test_truncated_tail_is_ignored(self):
+        """Тест что недописанная последняя запись не ломает восстановление"""
+        with Journal(self.path) as journal:
+            library = journal.restore()
+            library.add_book(Book("Книга", "Автор", 2008, "Жанр", "1"))
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write('{"op":"add","bo')
+
+        with Journal(self.path) as journal:
+            restored = journal.restore()
+            restored.add_book(Book("Книга 2", "Автор", 2008, "Жанр", "2"))
+
+        with Journal(self.path) as journal:
+            restored = journal.restore()
+
+        self.assertEqual(len(restored.get_all_books()), 2)
+
+    def test_restore_twice_subscribes_once(self):
+        """Тест что повторный restore не дублирует записи журнала"""
+        with Journal(self.path, batch_size=1) as journal:
+            library = journal.restore()
+            journal.restore(library)
+            library.add_book(Book("Книга", "Автор", 2008, "Жанр", "1"))
+
+        with open(self.path, encoding='utf-8') as file:
+            self.assertEqual(len(file.readlines()), 1)
@@ -0,0 +1,114 @@
+import unittest
+from src.books import Book
+from src.library import Library
+from src.loans import LoanManager, SimulationClock
+
+
+class TestLoanManager(unittest.TestCase):
+    """Тесты для выдачи книг"""
+
+    def setUp(self):
+        self.library = Library()
+        self.library.add_books(Book(f"Книга {i}", "Автор", 2000, "Жанр", str(i)) for i in range(5))
+        self.loans = LoanManager(self.library, loan_period=10)
+
+    def test_checkout_and_return(self):
+        """Тест выдачи и возврата книги"""
+        loan = self.loans.checkout("1", "Анна", now=0)
+
+        self.assertEqual(loan.due, 10)
+        self.assertIsNone(self.loans.checkout("1", "Борис", now=0))
+        self.assertIsNone(self.loans.checkout("нет такой", "Борис", now=0))
+        self.assertEqual(len(self.loans), 1)
+
+        self.loans.return_book("1", now=3)
+        self.assertEqual(len(self.loans), 0)
+        self.assertIsNotNone(self.loans.checkout("1", "Борис", now=3))
+
+    def test_hold_queue(self):
+        """Тест что после возврата книга уходит первому в очереди"""
+        self.loans.checkout("1", "Анна", now=0)
+        self.assertEqual(self.loans.place_hold("1", "Борис"), 1)
+        self.assertEqual(self.loans.place_hold("1", "Вера"), 2)
+
+        next_loan = self.loans.return_book("1", now=5)
+
+        self.assertEqual(next_loan.patron, "Борис")
+        self.assertEqual(list(self.loans.holds["1"]), ["Вера"])
+        self.loans.return_book("1", now=6)
+        self.assertEqual(self.loans.loans["1"].patron, "Вера")
+        self.assertNotIn("1", self.loans.holds)
+
+    def test_hold_by_borrower(self):
+        """Тест что читатель не встает в очередь за книгой, которая уже у него"""
+        self.loans.checkout("1", "Анна", now=0)
+
+        self.assertEqual(self.loans.place_hold("1", "Анна"), 0)
+        self.assertNotIn("1", self.loans.holds)
+
+    def test_hold_on_loaned_book(self):
+        """Тест что бронь на выданную книгу ставит читателя в очередь"""
+        self.loans.checkout("2", "Анна", now=0)
+
+        self.assertEqual(self.loans.place_hold("2", "Борис"), 1)
+        self.assertEqual(list(self.loans.holds["2"]), ["Борис"])
+
+    def test_hold_on_free_book(self):
+        """Тест что бронь на невыданную книгу отклоняется и не закрывает книгу"""
+        with self.assertRaises(ValueError):
+            self.loans.place_hold("2", "Борис")
+
+        self.assertNotIn("2", self.loans.holds)
+        self.assertIsNotNone(self.loans.checkout("2", "Анна", now=0))
+
+    def test_remove_loaned_book(self):
+        """Тест что удаление книги из библиотеки снимает ее выдачу и очередь"""
+        self.loans.checkout("1", "Анна", now=0)
+        self.loans.checkout("2", "Борис", now=0)
+        self.loans.place_hold("1", "Вера")
+
+        self.library.remove_book(self.library.search_by_isbn("1")[0])
+
+        self.assertNotIn("1", self.loans.loans)
+        self.assertNotIn("1", self.loans.holds)
+        self.assertEqual(len(self.loans), 1)
+        self.assertEqual(self.loans.sample_loan().isbn, "2")
+        self.assertEqual(self.loans.expire_overdue(now=100)[0].isbn, "2")
+
+    def test_expire_overdue(self):
+        """Тест что просрочки находятся по сроку и возвращенные книги не считаются"""
+        self.loans.checkout("1", "Анна", now=0)
+        self.loans.checkout("2", "Борис", now=5)
+        self.loans.checkout("3", "Вера", now=0)
+        self.loans.return_book("3", now=2)
+
+        self.assertEqual(self.loans.expire_overdue(10), [])
+        expired = self.loans.expire_overdue(11)
+        self.assertEqual([loan.isbn for loan in expired], ["1"])
+        self.assertEqual([loan.isbn for loan in self.loans.overdue_loans()], ["1"])
+        self.assertEqual(len(self.loans.due_queue), 1)
+
+        self.loans.return_book("1", now=12)
+        self.assertEqual(self.loans.overdue_loans(), [])
+        self.assertEqual([loan.isbn for loan in self.loans.expire_overdue(16)], ["2"])
+
+    def test_heap_compaction(self):
+        """Тест что устаревшие записи не копятся в куче"""
+        library = Library()
+        library.add_books(Book("Книга", "Автор", 2000, "Жанр", str(i)) for i in range(300))
+        loans = LoanManager(library)
+        for i in range(300):
+            loans.checkout(str(i), "Анна", now=0)
+        for i in range(200):
+            loans.return_book(str(i), now=1)
+
+        self.assertLess(len(loans.due_queue), 200)
+        self.assertEqual(len(loans.expire_overdue(100)), 100)
+
+    def test_clock(self):
+        """Тест часов симуляции"""
+        clock = SimulationClock()
+        self.assertEqual(clock.tick(), 1)
+        self.assertEqual(clock.tick(7), 8)
+        with self.assertRaises(ValueError):
+            clock.tick(-1)
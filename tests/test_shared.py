@@ -0,0 +1,70 @@
+import multiprocessing
+import unittest
+from src.books import Book
+from src.library import Library
+from src.shared import SharedCatalog, SharedLibraryView
+
+
+def _read_in_child(name, queue):
+    """Читает каталог из общего сегмента в другом процессе"""
+    with SharedLibraryView(name) as view:
+        queue.put((len(view), [book.title for book in view.search_by_author("Пушкин")]))
+
+
+class TestSharedCatalog(unittest.TestCase):
+    """Тесты для каталога в общей памяти"""
+
+    def setUp(self):
+        self.library = Library()
+        self.library.add_books([
+            Book("Евгений Онегин", "Пушкин", 1833, "Роман", "3"),
+            Book("Война и мир", "Толстой", 1869, "Роман", "1"),
+            Book("Руслан и Людмила", "Пушкин", 1820, "Поэма", "2"),
+            Book("Анна Каренина", "Толстой", 1877, "Роман", "10"),
+        ])
+        self.catalog = SharedCatalog.create(self.library)
+        self.view = self.catalog.view()
+
+    def tearDown(self):
+        self.view.close()
+        self.catalog.close()
+        self.catalog.unlink()
+
+    def test_search_matches_library(self):
+        """Тест что поиск в представлении совпадает с поиском в библиотеке"""
+        self.assertEqual(len(self.view), 4)
+        for isbn in ("1", "2", "3", "10", "404"):
+            self.assertEqual(repr(self.view.search_by_isbn(isbn)), repr(self.library.search_by_isbn(isbn)))
+        for author in ("Пушкин", "Толстой", "Гоголь"):
+            self.assertEqual(repr(self.view.search_by_author(author)), repr(self.library.search_by_author(author)))
+        for year in (1820, 1869, 2000):
+            self.assertEqual(repr(self.view.search_by_year(year)), repr(self.library.search_by_year(year)))
+        self.assertEqual(repr(self.view.search_by_genre("роман")), repr(self.library.search_by_genre("роман")))
+        self.assertEqual(self.view.get_statistics(), self.library.get_statistics())
+        self.assertEqual([book.isbn for book in self.view], ["3", "1", "2", "10"])
+
+    def test_columns_read_only(self):
+        """Тест что запись в колонку представления запрещена"""
+        with self.assertRaises(TypeError):
+            self.view.columns['years'][0] = 1
+        self.assertEqual(self.view.book(0).year, 1833)
+
+    def test_empty_library(self):
+        """Тест выгрузки пустой библиотеки"""
+        with SharedCatalog.create(Library()) as catalog, catalog.view() as view:
+            self.assertEqual(len(view), 0)
+            self.assertEqual(len(view.search_by_author("Пушкин")), 0)
+            self.assertEqual(view.get_statistics()['total_books'], 0)
+
+    def test_other_process(self):
+        """Тест что другой процесс читает тот же сегмент"""
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_read_in_child, args=(self.catalog.name, queue))
+        process.start()
+        result = queue.get(timeout=30)
+        process.join()
+
+        self.assertEqual(result, (4, ["Евгений Онегин", "Руслан и Людмила"]))
+        # После выхода читателя сегмент по-прежнему доступен
+        with self.catalog.view() as view:
+            self.assertEqual(len(view), 4)
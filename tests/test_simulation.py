@@ -1,6 +1,13 @@
+import contextlib
+import io
+import os
+import tempfile
 import unittest
 from unittest.mock import patch
-from src.simulation import run_simulation, random_book
+import random
+from src.main import main, parse_args
+from src.simulation import run_simulation, random_book, random_books
+from src.library import Library
 from src.books import Book
 
 
@@ -29,6 +36,32 @@ class TestSimulation(unittest.TestCase):
         self.assertTrue(book.isbn.isdigit())
         self.assertGreaterEqual(len(book.isbn), 10)  # Минимальная длина ISBN
 
+    def test_generate_random_books(self):
+        """Тест пакетной генерации книг"""
+        books = random_books(1000, random.Random(7))
+
+        self.assertEqual(len(books), 1000)
+        self.assertEqual(len({book.isbn for book in books}), 1000)
+        for book in books[:10]:
+            self.assertIsInstance(book, Book)
+            self.assertTrue(1600 <= book.year <= 2025)
+            self.assertTrue(book.isbn.isdigit())
+            self.assertGreaterEqual(len(book.isbn), 10)
+
+    def test_random_books_deterministic(self):
+        """Тест что с одинаковым seed получаются одинаковые книги"""
+        first = random_books(50, random.Random(42))
+        second = random_books(50, random.Random(42))
+
+        self.assertEqual([book.to_dict() for book in first], [book.to_dict() for book in second])
+
+    def test_random_books_bulk_load(self):
+        """Тест загрузки сгенерированных книг в библиотеку"""
+        library = Library()
+        library.add_books(random_books(500, random.Random(1)))
+
+        self.assertEqual(len(library.get_all_books()), 500)
+
     def test_run_simulation_with_seed(self):
         """Тест симуляции с фиксированным seed"""
         # Тестируем, что с одинаковым seed результаты одинаковы
@@ -62,3 +95,55 @@ class TestSimulation(unittest.TestCase):
 
             # начало симуляции + 8 начальных книг, то есть 9 логов
             self.assertEqual(len(log_calls), 9)
+
+    def test_run_simulation_workload(self):
+        """Тест профиля нагрузки и начального каталога"""
+        with patch('src.simulation.logger') as mock_logger:
+            run_simulation(steps=20, seed=3, workload='loans', catalog_size=100)
+            messages = [call.args[0] for call in mock_logger.info.call_args_list]
+
+        self.assertIn("Шаг 0: Добавлено случайных книг: 100", messages)
+        steps = [message for message in messages if message.startswith("Шаг ") and not message.startswith("Шаг 0")]
+        loan_steps = [message for message in steps if message.endswith(("Выдать книгу", "Вернуть книгу"))]
+        self.assertGreater(len(loan_steps), len(steps) // 2)
+
+        with self.assertRaises(ValueError):
+            run_simulation(steps=1, workload='unknown')
+
+    def test_headless_profile(self):
+        """Тест запуска без ввода с профилированием"""
+        with tempfile.TemporaryDirectory() as directory, patch('src.simulation.logger'), \
+                contextlib.redirect_stdout(io.StringIO()):
+            main(['--steps', '30', '--seed', '1', '--catalog-size', '50', '--profile', directory])
+            for name in ('profile.pstats', 'profile.txt', 'tracemalloc.txt', 'stacks.collapsed'):
+                self.assertTrue(os.path.exists(os.path.join(directory, name)))
+            with open(os.path.join(directory, 'profile.txt'), encoding='utf-8') as file:
+                report = file.read()
+            # Поток сэмплера работает в отдельном проходе и не попадает в отчет cProfile
+            self.assertIn("run_simulation", report)
+            self.assertNotIn("threading.py", report)
+
+    def test_bloom_filter_optional(self):
+        """Тест что фильтр Блума перед индексом ISBN включается только параметром"""
+        libraries = []
+
+        def make_library(*args, **kwargs):
+            libraries.append(Library(*args, **kwargs))
+            return libraries[-1]
+
+        with patch('src.simulation.Library', side_effect=make_library), patch('src.simulation.logger'):
+            run_simulation(steps=5, seed=1)
+            run_simulation(steps=5, seed=1, bloom_error_rate=0.01)
+        self.assertIsNone(libraries[0].get_index('isbn').bloom)
+        self.assertIsNotNone(libraries[1].get_index('isbn').bloom)
+        self.assertEqual(parse_args(['--bloom-error-rate', '0.05']).bloom_error_rate, 0.05)
+        with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+            parse_args(['--bloom-error-rate', '2'])
+
+    def test_resume_rejects_options(self):
+        """Тест что с --resume нельзя задать параметры, которые берутся из контрольной точки"""
+        self.assertIsNone(parse_args(['--resume', 'state.bin']).workload)
+        for option in (['--seed', '0'], ['--workload', 'loans'], ['--catalog-size', '10'],
+                       ['--bloom-error-rate', '0.01']):
+            with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+                parse_args(['--resume', 'state.bin'] + option)
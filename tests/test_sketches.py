@@ -0,0 +1,103 @@
+import random
+import unittest
+from src.books import Book
+from src.library import Library
+from src.sketches import HyperLogLog, CountMinSketch, HeavyHitters, QuantileSketch, StatisticsSketch
+
+
+class TestSketches(unittest.TestCase):
+    """Тесты для приблизительной статистики"""
+
+    def test_hyperloglog(self):
+        """Тест оценки количества различных значений и объединения"""
+        left, right = HyperLogLog(), HyperLogLog()
+        for i in range(20000):
+            left.add(i)
+            right.add(i + 10000)
+
+        self.assertAlmostEqual(left.count(), 20000, delta=20000 * 0.05)
+        left.merge(right)
+        self.assertAlmostEqual(left.count(), 30000, delta=30000 * 0.05)
+
+        small = HyperLogLog()
+        for value in ("a", "b", "c", "a"):
+            small.add(value)
+        self.assertEqual(small.count(), 3)
+
+    def test_count_min(self):
+        """Тест что оценка частоты не меньше настоящей и поддерживает уменьшение"""
+        sketch = CountMinSketch(width=256, depth=4)
+        for i in range(1000):
+            sketch.add(i % 50)
+        self.assertEqual(sketch.add(7, -5), sketch.estimate(7))
+
+        self.assertGreaterEqual(sketch.estimate(3), 20)
+        self.assertGreaterEqual(sketch.estimate(7), 15)
+        self.assertLess(sketch.estimate(3), 40)
+
+    def test_heavy_hitters(self):
+        """Тест что самые частые значения попадают в список"""
+        hitters = HeavyHitters(k=3)
+        rng = random.Random(1)
+        for _ in range(3000):
+            hitters.add(rng.choice(["Толстой"] * 5 + ["Пушкин"] * 3 + [f"Автор {rng.randrange(500)}"]))
+
+        self.assertEqual([value for value, _ in hitters.top(2)], ["Толстой", "Пушкин"])
+
+    def test_quantiles(self):
+        """Тест квантилей и объединения"""
+        left, right = QuantileSketch(k=64), QuantileSketch(k=64)
+        for year in range(1600, 1800):
+            left.add(year)
+        for year in range(1800, 2000):
+            right.add(year)
+
+        left.merge(right)
+
+        self.assertEqual(left.count, 400)
+        self.assertAlmostEqual(left.quantile(0.5), 1800, delta=20)
+        self.assertAlmostEqual(left.quantile(0.25), 1700, delta=20)
+        self.assertIsNone(QuantileSketch().quantile(0.5))
+
+    def test_library_approximate_statistics(self):
+        """Тест приблизительной статистики библиотеки и объединения шардов"""
+        shards = [Library(sketches=True), Library(sketches=True)]
+        for i in range(200):
+            shards[i % 2].add_book(Book(f"Книга {i}", f"Автор {i % 20}", 1900 + i % 100, "Роман", str(i)))
+        shards[0].remove_by_isbn("0")
+
+        stats = shards[0].get_statistics(approximate=True)
+        self.assertEqual(stats['total_books'], 99)
+        self.assertEqual(stats['unique_authors'], 10)
+
+        merged = StatisticsSketch()
+        for shard in shards:
+            merged.merge(shard.sketches)
+        summary = merged.summary()
+        self.assertEqual(summary['total_books'], 199)
+        self.assertEqual(summary['unique_authors'], 20)
+        self.assertAlmostEqual(summary['unique_isbns'], 200, delta=10)
+        self.assertEqual(summary['top_genres'], {"Роман": 199})
+        self.assertEqual(summary['year_bounds'], [1900, 1999])
+        self.assertEqual(len(summary['top_authors']), 10)
+        self.assertNotIn('books_per_author', summary)
+
+    def test_year_bounds_exact(self):
+        """Тест что границы годов точные, даже когда квантили их сжали"""
+        sketch = StatisticsSketch()
+        rng = random.Random(2)
+        for i in range(20000):
+            sketch.on_add(Book("Книга", "Автор", rng.randint(1700, 1900), "Роман", str(i)))
+        sketch.on_add(Book("Книга", "Автор", 2025, "Роман", "последняя"))
+        other = StatisticsSketch()
+        other.on_add(Book("Книга", "Автор", 1600, "Роман", "первая"))
+
+        sketch.merge(other)
+
+        self.assertEqual(sketch.summary()['year_bounds'], [1600, 2025])
+        self.assertEqual(StatisticsSketch().summary()['year_bounds'], [])
+
+    def test_approximate_requires_sketches(self):
+        """Тест ошибки, если скетчи не включены"""
+        with self.assertRaises(ValueError):
+            Library().get_statistics(approximate=True)